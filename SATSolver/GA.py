@@ -3,10 +3,17 @@
     Description: Defines the genetic algorithm and all the core functionality of it, including crossover and Tabu search
 """
 
-import copy
+import bisect
+import os
 import random
+import threading
+import time
+from collections import OrderedDict, deque
 import operator
-from decimal import Decimal
+import math
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import kernels
 from individual import Individual, Factory
 
 
@@ -22,7 +29,8 @@ class InputError(Exception):
 class GA:
     def __init__(self, formula, number_of_clauses, number_of_variables, tabu_list_length=None, max_false=5, rec=10,
                  k=None, max_generations=1000, population_size=100, sub_population_size=15, crossover_operator=0,
-                 max_flip=10000, is_rvcf=False, is_diversification=False):
+                 max_flip=10000, is_rvcf=False, is_diversification=False, notify_every=None, seed=None,
+                 fit_cache=None, notify_interval=0.05, workers=None):
 
         self.formula = formula
         self.numberOfClauses = int(number_of_clauses)
@@ -77,7 +85,20 @@ class GA:
             if not int(k) > 0:
                 raise InputError("Input Error! The parameter k (Flip Constraint) must be > 0!")
         self.k = int(k)
-        self._observers = set()
+        if notify_every is None:
+            # If no value specified - about 200 progress updates over a full run
+            notify_every = max(1, self.max_generations // 200)
+        elif not int(notify_every) > 0:
+            raise InputError("Input Error! The parameter notify_every (generations between progress updates) must be"
+                             " > 0!")
+        self.notify_every = int(notify_every)
+        # Minimum number of seconds between two progress updates, so that fast generations are not all reported
+        self.notify_interval = notify_interval
+        self._last_notified = None
+        # The generation the observer last heard of
+        self._notified_generation = None
+        # The one observer of this GA (the controller or a portfolio worker's observer), None if there is none
+        self._observer = None
         self._generation_counter = None
         self.best_individual_fitness = None
         self.best_individual = None
@@ -86,15 +107,270 @@ class GA:
 
         self.stop = False
 
-        # Initialize tabu, population and the sub_population to empty lists
-        self.tabu = []
+        # Initialize population and the sub_population to empty lists
         self.population = []
         self.sub_population = []
 
         # Used in tabu search to determine best configuration/move
         self.best = None
 
+        # Random number generators of this GA for the choose functions, selection and crossover, and for the initial
+        # population. All the randomness of a run comes from these, so seeding them makes the run repeatable.
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
+
+        # Evaluates the individuals of the population in parallel, the evaluations being independent of each other.
+        # The thread pool is created on first use and shut down when gasat returns.
+        self._workers = int(workers) if workers is not None else os.cpu_count() or 1
+        self._pool = None
+
+        # Least recently used cache of fitness values keyed on the packed assignment, as the same assignments keep
+        # reappearing through crossover and tabu search. Guarded by a lock as the thread pool evaluates concurrently.
+        # Sized to hold several generations' worth of individuals. A cache filled by an earlier GA on the same formula
+        # can be passed in as fit_cache to carry its fitness values over to this run.
+        self._fit_cache = OrderedDict() if fit_cache is None else fit_cache
+        self._fit_cache_cap = 10 * self.population_size
+        self._fit_cache_lock = threading.Lock()
+        # A cache inherited from a GA with a larger population is cut down to this GA's size, least recent first
+        while len(self._fit_cache) > self._fit_cache_cap:
+            self._fit_cache.popitem(last=False)
+
         self.false_counts = [0 for _ in self.formula]
+        # The atoms of every clause, as the crossover operators and the tabu search look them up per literal
+        self.abs_formula = [tuple(abs(literal) for literal in clause) for clause in self.formula]
+
+        # Evaluate from the packed assignment and the flat literal arrays below. Set to False to fall back to
+        # clause-by-clause evaluation.
+        self.use_bitmask = True
+        # Run the compiled kernels instead of the NumPy implementations whenever Numba is available
+        self.use_kernels = kernels.HAS_NUMBA
+        # Formulas with at least this many clauses are evaluated with the parallel kernels, one individual at a time
+        self.parallel_min_clauses = 50000
+        # Uniform formulas with at least this many clauses are evaluated with kernels generated for their clause width
+        # (see kernels.uniform_kernels), smaller ones are not worth the compilation. 3-SAT needs no compilation.
+        self.generated_min_clauses = 1000
+        self._build_incidence()
+
+        # The tabu list: a queue of at most tabu_list_length positions, the oldest of which is evicted on a push once
+        # it is full, together with a mask of the positions in the queue so that membership is a single lookup.
+        self.tabu_queue = deque(maxlen=self.tabu_list_length)
+        self.tabu_mask = np.zeros(self.num_words * 64 + 1, dtype=np.bool_)
+
+    def _build_incidence(self):
+        """
+        Indexes, for every variable v, the clauses in which v occurs as a positive (var_pos_clauses[v]) and as a
+        negated (var_neg_clauses[v]) literal. Repeated literals are indexed once, and clauses containing both v and -v
+        are left out for v: they stay true whatever its value, so flipping v never changes their count.
+        var_clauses[v] lists every clause containing v regardless of sign.
+        The same literals are also kept as flat arrays (lit_clause, lit_var, lit_sign) for whole-assignment passes, and
+        every clause without repeated literals as lit_flat[lit_start[c]:lit_start[c+1]] for clause-wise passes, with
+        the atom and sign of each of those literals in lit_atom and lit_positive. A literal repeated in a clause is
+        listed in rep_clause, rep_atom, rep_positive with its number of extra occurrences in rep_extra, so that the
+        per-occurrence degree of the clause can be recovered.
+        :return: void (no return value)
+        """
+        max_variable = max((abs(literal) for clause in self.formula for literal in clause), default=0)
+        # Some callers under-report the number of variables, so size everything by the formula itself as well. The
+        # packed assignment of an individual holding fewer atoms is padded with zeros, which would make the negated
+        # literals of the missing atoms true, so such individuals are evaluated clause by clause instead (see covers).
+        self.max_variable = max_variable
+        self.num_words = (max(self.numberOfVariables, max_variable) + 63) // 64
+
+        pos_clauses = [[] for _ in range(self.num_words * 64 + 1)]
+        neg_clauses = [[] for _ in range(self.num_words * 64 + 1)]
+        self.var_clauses = [[] for _ in range(self.num_words * 64 + 1)]
+        lit_clause = []
+        lit_literal = []
+        lit_flat = []
+        lit_start = [0]
+        repeated = []
+        for i, clause in enumerate(self.formula):
+            # Removes repeated literals but keeps the order of the clause
+            literals = dict.fromkeys(clause)
+            if len(literals) < len(clause):
+                repeated.extend((i, literal, clause.count(literal) - 1) for literal in literals
+                                if clause.count(literal) > 1)
+            lit_flat.extend(literals)
+            lit_start.append(len(lit_flat))
+            for literal in literals:
+                if literal > 0 or -literal not in literals:
+                    self.var_clauses[abs(literal)].append(i)
+                if -literal in literals:
+                    continue
+                if literal > 0:
+                    pos_clauses[literal].append(i)
+                else:
+                    neg_clauses[-literal].append(i)
+                lit_clause.append(i)
+                lit_literal.append(literal)
+        self.var_pos_clauses = [np.array(clauses, dtype=np.intp) for clauses in pos_clauses]
+        self.var_neg_clauses = [np.array(clauses, dtype=np.intp) for clauses in neg_clauses]
+        self.lit_clause = np.array(lit_clause, dtype=np.intp)
+        self.lit_var = np.abs(np.array(lit_literal, dtype=np.intp))
+        self.lit_sign = np.array(lit_literal, dtype=np.intp) > 0
+        self.lit_flat = np.array(lit_flat, dtype=np.intp)
+        self.lit_start = np.array(lit_start, dtype=np.intp)
+        self.lit_atom = np.abs(self.lit_flat)
+        self.lit_positive = self.lit_flat > 0
+        self.rep_clause = np.array([i for i, _, _ in repeated], dtype=np.intp)
+        self.rep_atom = np.array([abs(literal) for _, literal, _ in repeated], dtype=np.intp)
+        self.rep_positive = np.array([literal > 0 for _, literal, _ in repeated], dtype=np.bool_)
+        self.rep_extra = np.array([extra for _, _, extra in repeated], dtype=np.int32)
+        # np.ufunc.reduceat cannot reduce an empty segment, so the empty clauses are left out of the offsets
+        self._nonempty = np.diff(self.lit_start) > 0
+        self._reduce_start = self.lit_start[:-1][self._nonempty]
+
+        # Most instances are uniform k-SAT. In that case the clauses are also kept as a (clauses x k) array, which
+        # allows specialised evaluation without the per-clause offsets. Each literal is further split into the word
+        # and bit of its atom in Individual.bits and a 1 for negated literals, so that its value is a shift and xor.
+        widths = np.diff(self.lit_start)
+        if len(widths) > 0 and np.all(widths == widths[0]):
+            self.clause_width = int(widths[0])
+            self.clause_array = self.lit_flat.reshape(len(widths), self.clause_width)
+            positions = np.abs(self.clause_array) - 1
+            self.clause_words = positions >> 6
+            self.clause_shifts = (positions & 63).astype(np.uint64)
+            self.clause_flips = (self.clause_array < 0).astype(np.uint64)
+        else:
+            self.clause_width = None
+            self.clause_array = None
+            self.clause_words = self.clause_shifts = self.clause_flips = None
+        self._clause_kernels = None
+
+    def _ensure_true_counts(self, individual):
+        """
+        Computes the true literal counts of the individual from scratch if they are out of date.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: void (no return value)
+        """
+        if individual.true_counts is None:
+            individual.true_counts = self.clause_degrees(individual).astype(np.int32)
+            individual.num_unsat = int(np.count_nonzero(individual.true_counts == 0))
+
+    def _variable_values(self, individual):
+        """
+        The truth value of every variable of the individual as a boolean array indexed by variable (entry 0 unused).
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: boolean array of length num_words * 64 + 1.
+        """
+        words = self._assignment_words(individual)
+        values = np.unpackbits(words.view(np.uint8), bitorder='little').view(np.bool_)
+        return np.concatenate(([False], values))
+
+    def flip_gains(self, individual):
+        """
+        The improvement of flipping every variable of the individual, computed in a single pass over the literals: a
+        flip gains every unsatisfied clause containing the variable and loses every clause in which it holds the
+        only true literal.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: integer array where entry v is improvement(individual, v) (entry 0 unused).
+        """
+        size = len(self.var_pos_clauses)
+        if not self.use_bitmask:
+            return np.array([0] + [self.improvement(individual, v) for v in range(1, size)])
+        self._ensure_true_counts(individual)
+        if self.use_kernels:
+            gains = kernels.gains_kernel(self._assignment_words(individual), individual.true_counts, self.lit_clause,
+                                         self.lit_var, self.lit_sign, size)
+        else:
+            counts = individual.true_counts[self.lit_clause]
+            literal_true = self._variable_values(individual)[self.lit_var] == self.lit_sign
+            made = np.bincount(self.lit_var[counts == 0], minlength=size)
+            broken = np.bincount(self.lit_var[literal_true & (counts == 1)], minlength=size)
+            gains = made - broken
+        # The atoms beyond the end of the individual cannot be flipped
+        gains[individual.length + 1:] = 0
+        return gains
+
+    def _variable_mask(self, variables):
+        """
+        Packs a set of variables into words with the layout of Individual.bits.
+        :param variables: integer array of variables (starts at 1 - as per DIMACS format).
+        :return: uint64 array of length num_words with the bits of the given variables set.
+        """
+        mask = np.zeros(self.num_words, dtype=np.uint64)
+        positions = np.asarray(variables, dtype=np.int64) - 1
+        np.bitwise_or.at(mask, positions >> 6, np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64)))
+        return mask
+
+    def covers(self, individual):
+        """
+        Indicates whether the individual holds a value for every atom of the formula. Only then can its packed
+        assignment be used: sat and degree take the literals of an atom beyond the end of the individual to be false
+        for both signs, whereas the padded words would make the negated ones true.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: boolean.
+        """
+        return individual.length >= self.max_variable
+
+    def _assignment_words(self, individual):
+        """
+        The packed assignment of the individual, padded or truncated to num_words words.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: uint64 array of length num_words.
+        """
+        bits = individual.bits
+        if len(bits) == self.num_words:
+            return bits
+        words = np.zeros(self.num_words, dtype=np.uint64)
+        width = min(len(bits), self.num_words)
+        words[:width] = bits[:width]
+        return words
+
+    def _reduce_literals(self, ufunc, values, dtype):
+        """
+        Reduces a value per literal of lit_flat to a value per clause.
+        :param ufunc: The NumPy ufunc to reduce with, e.g. np.logical_or.
+        :param values: Array whose last axis holds a value for every literal of lit_flat.
+        :param dtype: The type of the result.
+        :return: array with the reduced value of every clause along the last axis, the identity of ufunc for empty
+        clauses.
+        """
+        result = np.full(values.shape[:-1] + (len(self._nonempty),), ufunc.identity, dtype=dtype)
+        if len(self._reduce_start) > 0:
+            result[..., self._nonempty] = ufunc.reduceat(values, self._reduce_start, axis=-1)
+        return result
+
+    def clause_satisfaction(self, individual):
+        """
+        sat (X,c) for every clause c of the formula at once.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: boolean array where entry c indicates whether clause c is satisfied by the individual.
+        """
+        if not self.covers(individual):
+            return np.array([self.sat(individual, clause) for clause in self.formula], dtype=np.bool_)
+        if self._use_parallel_kernels():
+            return kernels.satisfaction_parallel_kernel(self._assignment_words(individual), self.lit_flat,
+                                                        self.lit_start)
+        uniform = self._uniform_kernels()
+        if uniform is not None:
+            return uniform[0](self._assignment_words(individual), self.clause_words, self.clause_shifts,
+                              self.clause_flips)
+        if self.use_kernels:
+            return kernels.satisfaction_kernel(self._assignment_words(individual), self.lit_flat, self.lit_start)
+        if self.clause_array is not None:
+            # Gather the word of every literal, which only touches the variables of each clause
+            values = (self._assignment_words(individual)[self.clause_words] >> self.clause_shifts) ^ self.clause_flips
+            return (values & np.uint64(1)).any(axis=1)
+        # Gather the value of every literal and reduce them per clause over the clause offsets
+        literal_true = self._variable_values(individual)[self.lit_atom] == self.lit_positive
+        return self._reduce_literals(np.logical_or, literal_true, np.bool_)
+
+    def clause_degrees(self, individual):
+        """
+        The degree of every clause of the formula at once (see degree).
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :return: integer array where entry c is the number of true literals in clause c.
+        """
+        if not self.covers(individual):
+            # Repeated literals are counted once, as in lit_flat
+            return np.array([self.degree(individual, dict.fromkeys(clause)) for clause in self.formula],
+                            dtype=np.int32)
+        if self.use_kernels:
+            return kernels.degree_kernel(self._assignment_words(individual), self.lit_flat, self.lit_start)
+        literal_true = self._variable_values(individual)[self.lit_atom] == self.lit_positive
+        return self._reduce_literals(np.add, literal_true.astype(np.int32), np.int32)
 
     @staticmethod
     def sat(individual, clause):
@@ -109,9 +385,16 @@ class GA:
         clause.
         """
 
+        # Index the bit string directly rather than through individual.get. Atoms beyond the end of the individual
+        # have no value, so their literals are false either way.
+        data = individual.data
+        length = len(data)
         # Iterate over atoms in the clause
         for atom in clause:
-            if (atom > 0 and individual.get(atom)) or (atom <= 0 and individual.get(abs(atom)) == 0):
+            if atom > 0:
+                if atom <= length and data[atom - 1]:
+                    return True
+            elif 0 < -atom <= length and not data[-atom - 1]:
                 return True
         return False
 
@@ -149,12 +432,15 @@ class GA:
     #     # Clause is unsatisfiable - no true atoms
     #     return False
 
-    def evaluate(self, individual):
+    def evaluate(self, individual, bound=None):
         """
         The fitness of individual with respect to the formula.
         :param individual: Individual class (Implemented by Regan) representing a particular assignment of truth values
         to variables.
-        :return: the number of clauses of F which are not satisfied by X.
+        :param bound: Optional. When only whether the fitness is at most bound matters, counting may stop as soon as
+        more than bound clauses are found unsatisfied.
+        :return: the number of clauses of F which are not satisfied by X. If bound is given and the fitness exceeds it,
+        any value greater than bound may be returned instead.
         """
 
         if self.stop:
@@ -163,34 +449,168 @@ class GA:
         if individual.isCacheValid:
             return individual.fitness
 
-        individual.isCacheValid = True
-
-        # Keeps count of unsatisfied clauses
-        num_unsatisfied_clauses = 0
+        if self.use_bitmask and individual.true_counts is not None:
+            # Maintained incrementally by flip_incremental
+            num_unsatisfied_clauses = individual.num_unsat
+        elif self.use_bitmask:
+            key = individual.bits.tobytes()
+            num_unsatisfied_clauses = self._cached_fitness(key)
+            if num_unsatisfied_clauses is None:
+                num_unsatisfied_clauses = self._count_unsatisfied(individual, bound)
+                if bound is not None and num_unsatisfied_clauses > bound:
+                    # Counting may have stopped early, so this need not be the fitness and is not stored
+                    return num_unsatisfied_clauses
+                self._cache_fitness(key, num_unsatisfied_clauses)
+        else:
+            # Keeps count of unsatisfied clauses
+            num_unsatisfied_clauses = 0
 
-        # Iterate over clauses in the formula
-        for clause in self.formula:
+            # Iterate over clauses in the formula
+            for clause in self.formula:
 
-            # If a clause is unsatisfied increase the unsatisfied counter
-            if not self.sat(individual, clause):
-                num_unsatisfied_clauses = num_unsatisfied_clauses + 1
+                # If a clause is unsatisfied increase the unsatisfied counter
+                if not self.sat(individual, clause):
+                    num_unsatisfied_clauses = num_unsatisfied_clauses + 1
 
+        individual.isCacheValid = True
         individual.fitness = num_unsatisfied_clauses
         return num_unsatisfied_clauses
 
+    def _cached_fitness(self, key):
+        """
+        Looks up a fitness value in the cache, marking it as the most recently used.
+        :param key: The packed assignment as bytes.
+        :return: The fitness value, or None if it is not in the cache.
+        """
+        with self._fit_cache_lock:
+            fitness = self._fit_cache.get(key)
+            if fitness is not None:
+                self._fit_cache.move_to_end(key)
+        return fitness
+
+    def _cache_fitness(self, key, fitness):
+        """
+        Stores a fitness value in the cache, evicting the least recently used entry if the cache is full.
+        :param key: The packed assignment as bytes.
+        :param fitness: The number of clauses not satisfied by the assignment.
+        :return: void (no return value)
+        """
+        with self._fit_cache_lock:
+            self._fit_cache[key] = fitness
+            if len(self._fit_cache) > self._fit_cache_cap:
+                self._fit_cache.popitem(last=False)
+
+    def _uniform_kernels(self):
+        """
+        The kernels specialised for the clause width of a uniform formula, generated on first use.
+        :return: (satisfaction, evaluate, evaluate_population) kernels as returned by kernels.uniform_kernels, or None
+        if the formula is evaluated with the general kernels.
+        """
+        if not self.use_kernels or self.clause_width is None:
+            return None
+        if self._clause_kernels is None:
+            single_word = self.num_words == 1
+            if self.clause_width != 3 or single_word:
+                if len(self.formula) < self.generated_min_clauses:
+                    return None
+            self._clause_kernels = kernels.uniform_kernels(self.clause_width, single_word)
+        return self._clause_kernels
+
+    def _use_parallel_kernels(self):
+        """
+        Whether the formula is large enough for the parallel kernels to be worth their overhead.
+        :return: True if clauses are evaluated with the parallel kernels.
+        """
+        return self.use_kernels and len(self.formula) >= self.parallel_min_clauses
+
+    def _count_unsatisfied(self, individual, bound=None):
+        """
+        Counts the clauses not satisfied by the individual from its packed assignment, bypassing every cache.
+        :param individual: Individual class representing a particular assignment of truth values to variables.
+        :param bound: Optional. The compiled kernels stop counting once more than bound clauses are unsatisfied.
+        :return: the number of clauses of F which are not satisfied by X, or bound + 1 if the kernels stopped early.
+        """
+        if not self.covers(individual):
+            return len(self.formula) - int(np.count_nonzero(self.clause_satisfaction(individual)))
+        if self._use_parallel_kernels():
+            return kernels.evaluate_parallel_kernel(self._assignment_words(individual), self.lit_flat, self.lit_start)
+        if bound is None:
+            bound = len(self.formula)
+        uniform = self._uniform_kernels()
+        if uniform is not None:
+            return uniform[1](self._assignment_words(individual), self.clause_words, self.clause_shifts,
+                              self.clause_flips, bound)
+        if self.use_kernels:
+            return kernels.evaluate_kernel(self._assignment_words(individual), self.lit_flat, self.lit_start, bound)
+        # Every clause is tested at once against the assignment
+        return len(self.formula) - int(np.count_nonzero(self.clause_satisfaction(individual)))
+
+    def evaluate_population(self, individuals):
+        """
+        The fitness of several individuals at once. The individuals whose fitness is neither known nor in the fitness
+        cache are evaluated in a single batch: their packed assignments are stacked into a matrix, which is divided
+        over the thread pool.
+        :param individuals: List of individuals.
+        :return: list of the fitness values, in the order of individuals.
+        """
+
+        if self.stop:
+            raise GAStop("GA needs to be stopped.")
+
+        # With the parallel kernels each evaluation already runs on all of Numba's threads, one individual at a time
+        if self.use_bitmask and not self._use_parallel_kernels():
+            pending = []
+            for individual in individuals:
+                if not individual.isCacheValid and individual.true_counts is None:
+                    key = individual.bits.tobytes()
+                    fitness = self._cached_fitness(key)
+                    if fitness is None:
+                        # The others are left to evaluate
+                        if self.covers(individual):
+                            pending.append((individual, key))
+                    else:
+                        individual.fitness = fitness
+                        individual.isCacheValid = True
+            if pending:
+                matrix = np.stack([self._assignment_words(individual) for individual, _ in pending])
+                workers = min(len(pending), self._workers)
+                if workers > 1:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(max_workers=self._workers)
+                    blocks = np.array_split(matrix, workers)
+                    fitness_values = np.concatenate(list(self._pool.map(self._count_unsatisfied_rows, blocks)))
+                else:
+                    fitness_values = self._count_unsatisfied_rows(matrix)
+                for (individual, key), fitness in zip(pending, fitness_values.tolist()):
+                    self._cache_fitness(key, fitness)
+                    individual.fitness = fitness
+                    individual.isCacheValid = True
+        return [self.evaluate(individual) for individual in individuals]
+
+    def _count_unsatisfied_rows(self, matrix):
+        """
+        Counts the clauses not satisfied by each row of a matrix of packed assignments.
+        :param matrix: (individuals x num_words) uint64 array.
+        :return: integer array with the number of unsatisfied clauses of every row.
+        """
+        uniform = self._uniform_kernels()
+        if uniform is not None:
+            return uniform[2](matrix, self.clause_words, self.clause_shifts, self.clause_flips)
+        if self.use_kernels:
+            return kernels.evaluate_population_kernel(matrix, self.lit_flat, self.lit_start)
+        # The value of every literal for every row, reduced per clause over the clause offsets
+        positions = self.lit_atom - 1
+        values = (matrix[:, positions >> 6] >> (positions & 63).astype(np.uint64)) & np.uint64(1)
+        satisfied = self._reduce_literals(np.logical_or, values.astype(np.bool_) == self.lit_positive, np.bool_)
+        return len(self.formula) - np.count_nonzero(satisfied, axis=1)
+
     def true_clauses(self, individual):
         """
         The function returns a string of zeros and ones indicating which clauses are true and false.
 
         :return: string of zeros and ones.
         """
-        return_string = ''
-        for clause in self.formula:
-            if self.sat(individual, clause):
-                return_string += str(1)
-            else:
-                return_string += str(0)
-        return return_string
+        return ''.join('1' if satisfied else '0' for satisfied in self.clause_satisfaction(individual))
 
     def improvement(self, individual, index):
         """
@@ -203,12 +623,32 @@ class GA:
         :return: computed improvement value.
         """
 
-        new_individual = copy.deepcopy(individual)
-        # Flip the bit at the specified index
-        new_individual.flip(abs(index))
+        index = abs(index)
+        if self.use_bitmask and index <= individual.length and index < len(self.var_pos_clauses):
+            # Only the clauses containing the atom are touched by the flip
+            self._ensure_true_counts(individual)
+            pos_clauses, neg_clauses = self.var_pos_clauses[index], self.var_neg_clauses[index]
+            if self.use_kernels:
+                if individual.get(index):
+                    return kernels.improvement_kernel(individual.true_counts, pos_clauses, neg_clauses)
+                return kernels.improvement_kernel(individual.true_counts, neg_clauses, pos_clauses)
+            fitness = individual.num_unsat
+            individual.flip_incremental(index, pos_clauses, neg_clauses)
+            new_fitness = individual.num_unsat
+            individual.flip_incremental(index, pos_clauses, neg_clauses)
+            return fitness - new_fitness
+
+        fitness = self.evaluate(individual)
+        # Flip the bit at the specified index, evaluate and flip it back rather than working on a copy
+        individual.flip(index)
+        new_fitness = self.evaluate(individual)
+        individual.flip(index)
+        # The flip pair restored the original assignment, and with it the original fitness
+        individual.fitness = fitness
+        individual.isCacheValid = True
 
         # Calculate improvement in fitness
-        return individual.fitness - self.evaluate(new_individual)
+        return fitness - new_fitness
 
     def corrective_clause(self, x, y):
         """
@@ -219,19 +659,19 @@ class GA:
         :return: The generated individual z
         """
 
-        z = Individual(self.numberOfVariables, parents=(x, y))
-        clauses = [i for i in range(self.numberOfClauses) if
-                   not self.sat(x, self.formula[i]) and not self.sat(y, self.formula[i])]
+        z = Individual(self.numberOfVariables, parents=(x, y), rng=self._rng)
+        # The clauses false in both parents
+        clauses = np.flatnonzero(~self.clause_satisfaction(x) & ~self.clause_satisfaction(y))
+        clauses = clauses[clauses < self.numberOfClauses]
         for index in clauses:
-            clause = self.formula[index]
             best_pos = 0
             best_improvement = 0
-            for i in range(len(clause)):
+            for atom in self.abs_formula[index]:
                 # Find best index to flip in current clause. Absolute value of index must be used
-                current_improvement = self.improvement(x, abs(clause[i])) + self.improvement(y, abs(clause[i]))
+                current_improvement = self.improvement(x, atom) + self.improvement(y, atom)
                 if current_improvement >= best_improvement:
                     best_improvement = current_improvement
-                    best_pos = abs(clause[i])
+                    best_pos = atom
             if best_pos != 0:
                 # TODO: Check if we could perhaps use 1 - x.get(best_pos) to avoid the flip
                 z.set(best_pos, x.get(best_pos))
@@ -261,33 +701,38 @@ class GA:
         :return: The generated individual z
         """
 
-        z = Individual(self.numberOfVariables, parents=(x, y))
-        for clause in self.formula:
+        z = Individual(self.numberOfVariables, parents=(x, y), rng=self._rng)
+        satisfied_x = self.clause_satisfaction(x)
+        satisfied_y = self.clause_satisfaction(y)
+        for index in np.flatnonzero(~satisfied_x & ~satisfied_y):
             best_pos = 0
             maximum_improvement = 0
-            if not self.sat(x, clause) and not self.sat(y, clause):
-                for i in range(len(clause)):
-                    current_improvement = self.improvement(x, abs(clause[i])) + self.improvement(y, abs(clause[i]))
-                    if current_improvement >= maximum_improvement:
-                        maximum_improvement = current_improvement
-                        best_pos = abs(clause[i])
-                if maximum_improvement != 0:
-                    z.set(best_pos, x.get(best_pos))
-                    z.flip(best_pos)
+            for atom in self.abs_formula[index]:
+                current_improvement = self.improvement(x, atom) + self.improvement(y, atom)
+                if current_improvement >= maximum_improvement:
+                    maximum_improvement = current_improvement
+                    best_pos = atom
+            if maximum_improvement != 0:
+                z.set(best_pos, x.get(best_pos))
+                z.flip(best_pos)
 
         # Truth maintenance - See section 4.2 of the paper
-        for clause in self.formula:
+        for index in np.flatnonzero(satisfied_x & satisfied_y):
+            clause = self.formula[index]
             best_pos = -1
             minimum_improvement = self.numberOfClauses + 1
-            if self.sat(x, clause) and self.sat(y, clause) and not self.sat(z, clause):
-                for i in range(len(clause)):
-                    if x.get(abs(clause[i])) == 1 or y.get(abs(clause[i])) == 1:
-                        current_improvement = self.improvement(x, abs(clause[i])) + self.improvement(y, abs(clause[i]))
-                        z_new = copy.deepcopy(z)
-                        z_new.set(abs(clause[i]), 1)
-                        if current_improvement < minimum_improvement and self.sat(z_new, clause):
+            if not self.sat(z, clause):
+                for atom in self.abs_formula[index]:
+                    if x.get(atom) == 1 or y.get(atom) == 1:
+                        current_improvement = self.improvement(x, atom) + self.improvement(y, atom)
+                        # Try setting the atom on z itself and restore it afterwards
+                        old_value = z.get(atom)
+                        z.set(atom, 1)
+                        is_sat = self.sat(z, clause)
+                        z.set(atom, old_value)
+                        if current_improvement < minimum_improvement and is_sat:
                             minimum_improvement = current_improvement
-                            best_pos = abs(clause[i])
+                            best_pos = atom
                 if not best_pos == -1:
                     z.set(best_pos, 1)
         return z
@@ -301,16 +746,71 @@ class GA:
         :return: The generated individual z.
         """
 
-        z = Individual(self.numberOfVariables, parents=(x, y))
-        for clause in self.formula:
-            if self.sat(x, clause) and not self.sat(y, clause):
-                for i in range(len(clause)):
-                    z.set(abs(clause[i]), x(abs(clause[i])))
-            elif not self.sat(x, clause) and self.sat(y, clause):
-                for i in range(len(clause)):
-                    z.set(abs(clause[i]), y(abs(clause[i])))
+        z = Individual(self.numberOfVariables, parents=(x, y), rng=self._rng)
+        # For every clause satisfied by exactly one of the parents, the atoms of the clause are copied from that parent
+        # (0 for x, 1 for y, -1 when neither or both satisfy it)
+        sat_x = self.clause_satisfaction(x)
+        sat_y = self.clause_satisfaction(y)
+        source = np.where(sat_x & ~sat_y, 0, np.where(~sat_x & sat_y, 1, -1))
+        literal_source = source[np.repeat(np.arange(len(self.formula)), np.diff(self.lit_start))]
+        copied = literal_source >= 0
+        variables = np.abs(self.lit_flat[copied])
+        literal_source = literal_source[copied]
+        # Clauses are copied in order, so an atom takes its value from the last such clause it occurs in
+        _, last = np.unique(variables[::-1], return_index=True)
+        last = len(variables) - 1 - last
+        from_x = self._variable_mask(variables[last][literal_source[last] == 0])
+        from_y = self._variable_mask(variables[last][literal_source[last] == 1])
+        z.bits = (np.bitwise_and(self._assignment_words(z), np.invert(from_x | from_y))
+                  | np.bitwise_and(self._assignment_words(x), from_x)
+                  | np.bitwise_and(self._assignment_words(y), from_y))
         return z
 
+    @property
+    def tabu(self):
+        """
+        The positions in the tabu list, oldest first. The tuple is a snapshot, so the list is changed through
+        push_tabu or by assigning to tabu.
+        :return: tuple of positions.
+        """
+        return tuple(self.tabu_queue)
+
+    @tabu.setter
+    def tabu(self, positions):
+        """
+        Empties the tabu list and pushes the given positions onto it in order.
+        :param positions: Iterable of positions.
+        :return: void (no return value)
+        """
+        self.tabu_queue.clear()
+        self.tabu_mask[:] = False
+        for position in positions:
+            self.push_tabu(position)
+
+    def is_tabu(self, position):
+        """
+        Determines whether a position is in the tabu list.
+        :param position: A position (index) in an assignment.
+        :return: True if the position is tabu.
+        """
+        return 0 <= position < len(self.tabu_mask) and bool(self.tabu_mask[position])
+
+    def push_tabu(self, position):
+        """
+        Adds a position to the tabu list. A position that is already tabu is moved to the back of the queue, otherwise
+        the oldest position is evicted if the list is full.
+        :param position: A position (index) in an assignment.
+        :return: void (no return value)
+        """
+        if self.tabu_queue.maxlen == 0 or not 0 <= position < len(self.tabu_mask):
+            return
+        if self.tabu_mask[position]:
+            self.tabu_queue.remove(position)
+        elif len(self.tabu_queue) == self.tabu_queue.maxlen:
+            self.tabu_mask[self.tabu_queue[0]] = False
+        self.tabu_queue.append(position)
+        self.tabu_mask[position] = True
+
     def standard_tabu_choose(self, assignment):
         """
         Choose function for the Tabu search. The best move (flips of value of an assignment) is chosen i.e.
@@ -319,41 +819,29 @@ class GA:
         :return: A position (index) in the assignment due to which maximum gain is obtained and the array of positions
         from which it was randomly chosen.
         """
-        # TODO: We can use one temp and just do flips on that - Might be faster than all these deep copies
-        # A list to maintain the position(s) where the gain (by flip) is the best. 
-        positions = []
-        # The current overall best gain observed. Initially, it is set to a large negative value.
-        best_sigma = Decimal('-Infinity')
-        # Iterate through each of the positions (atoms) of the individual.
-        for position in range(1, len(assignment.data) + 1):
-            # A copy of the original individual is made and the particular position of the copy is flipped.
-            if position > 102:
-                falseValue = False
-            temp = copy.deepcopy(assignment)
-            temp.flip(position)
-            # If the move is not in the tabu list and the number of unsatisfied clauses in the copy is
-            # better (lower) than that of the best_assignment, then we can consider this move as a possibility.
-            if (position not in self.tabu) or (self.evaluate(temp) < self.evaluate(self.best)):
-                # Calculate the gain in the fitness function.
-                gain = self.improvement(assignment, position)
-                # If a new best gain is found (greater than the previous best), then we empty the list
-                # as the list should not include positions of the previous best gain.
-                # The list will currently only include the position of the current move.
-                if gain > best_sigma:
-                    positions = []
-                    best_sigma = gain
-                    positions.append(position)
-                # If the gain calculated is equal to the best gain calculated so far, we simply append the position.
-                elif gain == best_sigma:
-                    positions.append(position)
-            # This will only fire in the case that the we have not yet managed to find neither an individual who wasn't
-            # in the tabu list nor one with a better evaluation in each iteration of the for loop above.
-            elif best_sigma == Decimal('-Infinity'):
-                positions.append(position)
+        length = assignment.length
+        # The gain in the fitness function for flipping each of the positions (atoms) of the individual
+        gains = np.zeros(length + 1, dtype=np.int64)
+        all_gains = self.flip_gains(assignment)[:length + 1]
+        gains[:len(all_gains)] = all_gains
+        tabu = np.zeros(length + 1, dtype=np.bool_)
+        width = min(length + 1, len(self.tabu_mask))
+        tabu[:width] = self.tabu_mask[:width]
+        # If the move is not in the tabu list or the number of unsatisfied clauses after the flip is
+        # better (lower) than that of the best_assignment, then we can consider this move as a possibility.
+        allowed = ~tabu | (self.evaluate(assignment) - gains < self.evaluate(self.best))
+        allowed[0] = False
+        if allowed.any():
+            # The positions with the best gain among the allowed moves
+            best_sigma = gains[allowed].max()
+            positions = np.flatnonzero(allowed & (gains == best_sigma)).tolist()
+        else:
+            # Every move is tabu and none of them improves on the best assignment, so all of them are candidates
+            positions = list(range(1, length + 1))
         # Return a position that is randomly selected in those which have the maximum sigma
         # i.e. out of those elements in the positions list.
         # Also return the positions list for the purposes of testing
-        return random.choice(positions), positions
+        return positions[self._rng.randrange(len(positions))], positions
 
     def standard_tabu(self, individual_in, choose_function):
         """
@@ -363,9 +851,14 @@ class GA:
         :param choose_function: A function object
         :return: An individual that conforms to the Tabu restrictions.
         """
+        # Bound to locals as they are used for every clause in every flip
+        formula = self.formula
+        abs_formula = self.abs_formula
+        sat = self.sat
+        false_counts = self.false_counts
+        max_false = self.max_false
         if self.is_diversification:
             forbidden_flips = {}
-        self.tabu = self.tabu[:self.tabu_list_length]
         self.best = individual_in
         num_flips = 0
         while (self.evaluate(self.best) != 0) and (self.max_flip > num_flips):
@@ -375,8 +868,9 @@ class GA:
             # the deep coppy on the next line to improve performance and altered all lines up to the second if statement
             # testing for diversification to individual_in
             # individual_temp = copy.deepcopy(individual_in)
-            if not index[0] in self.tabu:
-                individual_in.flip(index[0])
+            if not self.is_tabu(index[0]):
+                self._flip(individual_in, index[0])
+                # Both fitness values are kept up to date by _flip, so neither evaluation counts the clauses again
                 if self.evaluate(individual_in) < self.evaluate(self.best):
                     self.best = individual_in
                 num_flips += 1
@@ -384,60 +878,45 @@ class GA:
                 # This is for diversifiaction
                 if self.is_diversification:
                     # Increment all bits that have been flipped to make a Max_false clause positive
-                    temp_flips = copy.deepcopy(forbidden_flips)
-                    for index2 in temp_flips.items():
-                        # index2 is a returned tuple from the forbidden_flips, which records the index and the amount of
-                        # times it has been flipped. The index thus of forbidden_filips is thus the index 0 of the
-                        # returned tuple. That is why there is a dereference inside a dereference.
-                        forbidden_flips[index2[0]] += 1
-                        # Check if pos has been flipped k times since last flip and remove it if it has
-                        # this frees that variable up to be flipped next time it is maximal in a max_false clause
-                        if forbidden_flips[index2[0]] == self.k:
-                            del forbidden_flips[index2[0]]
+                    self._age_forbidden_flips(forbidden_flips)
 
                 # individual_in = individual_temp
                 if self.is_diversification:
-                    temp_individual_in = copy.deepcopy(individual_in)
+                    temp_individual_in = individual_in.clone()
                     i = 0
-                    for divers_clause in self.formula:
-                        if not self.sat(temp_individual_in, divers_clause):
-                            self.false_counts[i] += 1
+                    for divers_clause in formula:
+                        if not sat(temp_individual_in, divers_clause):
+                            false_counts[i] += 1
 
                             # if this clause has reached or exceeded max_false counts, making it a stumble clause
-                            if self.false_counts[i] >= self.max_false:
+                            if false_counts[i] >= max_false:
                                 try:
-                                    value = max(divers_clause, key=lambda c: self.improvement(temp_individual_in, abs(c)))
+                                    pos = max(abs_formula[i], key=lambda c: self.improvement(temp_individual_in, c))
                                 except ValueError as e:
                                     raise e
-                                pos = abs(value)
 
                                 # for checking which of the clauses are turned false after diversification flip
-                                individual_temp = copy.deepcopy(temp_individual_in)
+                                individual_temp = temp_individual_in.clone()
                                 # Check if pos has been flipped before
                                 # flips this one stubborn bit and refuse to flip it back before k flips.
                                 if pos not in forbidden_flips.keys():
                                     # set to 0 and not 1 because it means that if k is 5 only on flip 6 can
                                     # pos be flipped
-                                    temp_individual_in.flip(pos)
-                                    temp_flips = copy.deepcopy(forbidden_flips)
-                                    for index4 in temp_flips.items():
-                                        forbidden_flips[index4[0]] += 1
-                                        # Check if pos has been flipped k times since last flip and remove it if it has
-                                        # this frees that variable up to be flipped next time it is maximal in a max_false clause
-                                        if forbidden_flips[index4[0]] == self.k:
-                                            del forbidden_flips[index4[0]]
+                                    self._flip(temp_individual_in, pos)
+                                    self._age_forbidden_flips(forbidden_flips)
                                     forbidden_flips[pos] = 0
                                     # flips this clause to being positive only if the maximal bit was flipped. a loop could
                                     # be set into the structure to say if the maximal bit cant be flipped due to not having
                                     # had enough flips then the next maximul could be flipped.
-                                    self.false_counts[i] = 0
+                                    false_counts[i] = 0
 
+                                satisfied_before = self.clause_satisfaction(individual_temp)
                                 for _ in range(self.rec):
 
-                                    now_false_clauses = [f_clause for f_clause in self.formula
-                                                         if not self.sat(temp_individual_in, f_clause)
-                                                         and self.sat(individual_temp, f_clause)]
-                                    for nested_clause in now_false_clauses:
+                                    # The clauses turned false by the flips since individual_temp was taken
+                                    now_false_clauses = np.flatnonzero(
+                                        satisfied_before & ~self.clause_satisfaction(temp_individual_in))
+                                    for nested_clause in (formula[c] for c in now_false_clauses):
                                         temp_clause = [c for c in nested_clause if c not in forbidden_flips.keys()]
 
                                         if len(temp_clause) > 0:
@@ -452,19 +931,14 @@ class GA:
 
                                             # set to 0 and not 1 because it means that if k is 5 only on flip 6 can
                                             # pos be flipped
-                                            temp_individual_in.flip(pos)
+                                            self._flip(temp_individual_in, pos)
                                             # increment all remaining forbidden flips as a flip has taken place
-                                            temp_flips = copy.deepcopy(forbidden_flips)
-                                            for index3 in temp_flips.items():
-                                                forbidden_flips[index3[0]] += 1
-                                                # Check if pos has been flipped k times since last flip and remove it if it has
-                                                # this frees that variable up to be flipped next time it is maximal in a max_false clause
-                                                if forbidden_flips[index3[0]] == self.k:
-                                                    del forbidden_flips[index3[0]]
+                                            self._age_forbidden_flips(forbidden_flips)
                                             forbidden_flips[pos] = 0
                                             # not sure if a secondary maximal should be taken for the false clause.
 
-                                if self.evaluate(temp_individual_in) < self.evaluate(self.best):
+                                best_fitness = self.evaluate(self.best)
+                                if self.evaluate(temp_individual_in, best_fitness - 1) < best_fitness:
                                     self.best = temp_individual_in
                         i = i + 1
                     # NB! NB! NB! This is somewhat confusing and isnt clear in the paper. After all the processing has
@@ -475,6 +949,35 @@ class GA:
                     individual_in = temp_individual_in
         return self.best
 
+    def _flip(self, individual, index):
+        """
+        Flips a position of the individual and, on the packed path, updates its true literal counts for the clauses
+        of that variable only, so that its fitness stays known without evaluating the whole formula again.
+        :param individual: The individual to flip.
+        :param index: A position (index) in the individual.
+        :return: void (no return value)
+        """
+        if self.use_bitmask and 0 < index < len(self.var_pos_clauses):
+            self._ensure_true_counts(individual)
+            individual.flip_incremental(index, self.var_pos_clauses[index], self.var_neg_clauses[index])
+        else:
+            individual.flip(index)
+
+    def _age_forbidden_flips(self, forbidden_flips):
+        """
+        Counts one more flip for every atom in forbidden_flips and removes the atoms that have now been forbidden for
+        k flips, which frees them up to be flipped the next time they are maximal in a max_false clause.
+        :param forbidden_flips: Dictionary from atom to the number of flips since it was last flipped.
+        :return: void (no return value)
+        """
+        expired = []
+        for pos, count in forbidden_flips.items():
+            forbidden_flips[pos] = count + 1
+            if count + 1 == self.k:
+                expired.append(pos)
+        for pos in expired:
+            del forbidden_flips[pos]
+
     def choose_rvcf(self, individual_in):
         """
 
@@ -483,9 +986,10 @@ class GA:
         """
 
         positions = []
-        best_sigma = Decimal('-Infinity')
-        for position in range(1, len(individual_in.data) + 1):
-            gain = self.improvement(individual_in, position)
+        best_sigma = -math.inf
+        gains = self.flip_gains(individual_in)
+        for position in range(1, individual_in.length + 1):
+            gain = int(gains[position]) if position < len(gains) else 0
             if gain > best_sigma:
                 positions = []
                 best_sigma = gain
@@ -493,7 +997,7 @@ class GA:
             elif gain == best_sigma:
                 positions.append(position)
 
-        best_sigma = Decimal('-Infinity')
+        best_sigma = -math.inf
         max_weights = []
         for j in positions:
             weight = self.weight(individual_in, j)
@@ -504,7 +1008,7 @@ class GA:
             elif weight == best_sigma:
                 max_weights.append(j)
 
-        return random.choice(max_weights), max_weights
+        return max_weights[self._rng.randrange(len(max_weights))], max_weights
 
     def weight(self, individual, index):
         """
@@ -526,12 +1030,16 @@ class GA:
         # c_zeros = [clause for clause in self.formula if (index in clause or -index in clause) and
         #            (individual.get(abs(index)) == 0)]
 
-        c_ones = [clause for clause in self.formula
-                  if (index in clause and individual.get(abs(index)) == 1)
-                  or (-index in clause and individual.get(abs(index)) == 0)]
-        c_zeros = [clause for clause in self.formula
-                   if (index in clause and individual.get(abs(index)) == 0)
-                   or (-index in clause and individual.get(abs(index)) == 1)]
+        # Only the clauses in which the atom occurs can end up in either list
+        value = individual.get(abs(index))
+        clauses = self.var_clauses[abs(index)] if abs(index) < len(self.var_clauses) else []
+        formula = self.formula
+        c_ones = [i for i in clauses
+                  if (index in formula[i] and value == 1)
+                  or (-index in formula[i] and value == 0)]
+        c_zeros = [i for i in clauses
+                   if (index in formula[i] and value == 0)
+                   or (-index in formula[i] and value == 1)]
 
         length_c_ones = len(c_ones)
         length_c_zeros = len(c_zeros)
@@ -544,12 +1052,24 @@ class GA:
         # To cater for the case where the length is 0
         ratio_ones = 0
         ratio_zeros = 0
+        if length_c_ones == 0 and length_c_zeros == 0:
+            return 0
+
+        # The true literal counts are the clause degrees, and are kept up to date across the calls of choose_rvcf
+        self._ensure_true_counts(individual)
+        degrees = individual.true_counts
+        if len(self.rep_clause) > 0:
+            # degree counts every occurrence of a true literal, the true literal counts only distinct literals
+            literal_true = ((self._variable_values(individual)[self.rep_atom] == self.rep_positive)
+                            & (self.rep_atom <= individual.length))
+            degrees = degrees.copy()
+            np.add.at(degrees, self.rep_clause[literal_true], self.rep_extra[literal_true])
         if length_c_ones > 0:
-            sum_ones = sum(self.degree(individual, c) for c in c_ones)
+            sum_ones = int(degrees[c_ones].sum())
             ratio_ones = sum_ones / length_c_ones
 
         if length_c_zeros > 0:
-            sum_zeros = sum(self.degree(individual, c) for c in c_zeros)
+            sum_zeros = int(degrees[c_zeros].sum())
             ratio_zeros = sum_zeros / length_c_zeros
 
         return ratio_ones + ratio_zeros
@@ -566,14 +1086,16 @@ class GA:
 
         #can this not just use a simple int counter variable?
         # list_of_literals = []
+        data = individual.data
+        length = len(data)
         degree = 0
         for literal in clause:
             if literal > 0:
-                if individual.get(literal) == 1:
+                if literal <= length and data[literal - 1]:
                     # list_of_literals.append(literal)
                     degree += 1
             else:
-                if individual.get(abs(literal)) == 0:
+                if 0 < -literal <= length and not data[-literal - 1]:
                     # list_of_literals.append(literal)
                     degree += 1
 
@@ -597,15 +1119,17 @@ class GA:
                     false_clauses.append(self.formula[i])
                     self.false_counts[i] = 0
 
-        individual_temp = copy.deepcopy(individual)
+        individual_temp = individual.clone()
         forbidden_flips = {}
+        # individual itself is never flipped, so its clauses are only tested once
+        satisfied_before = self.clause_satisfaction(individual)
         for clause in false_clauses:
             self.check_flip(individual_temp, clause, forbidden_flips)
             for _ in range(self.rec):
-                now_false_clauses = [self.formula[i] for i in range(len(self.formula))
-                                     if self.sat(individual_temp, clause) and not self.sat(individual, clause)]
+                # The clauses turned false by the flips made on individual_temp so far
+                now_false_clauses = np.flatnonzero(satisfied_before & ~self.clause_satisfaction(individual_temp))
                 for nested_clause in now_false_clauses:
-                    self.check_flip(individual_temp, nested_clause, forbidden_flips)
+                    self.check_flip(individual_temp, self.formula[nested_clause], forbidden_flips)
         return individual_temp
 
     def check_flip(self, individual, clause, iteration_dict):
@@ -618,6 +1142,9 @@ class GA:
         """
 
         temp_clause = [c for c in clause if c not in iteration_dict.keys()]
+        if not temp_clause:
+            # Every literal of the clause is forbidden
+            return
         try:
             value = max(temp_clause, key=lambda c: self.improvement(individual, c))
         except ValueError as e:
@@ -641,11 +1168,13 @@ class GA:
 
     def select(self):
         """
-        Selects two parents from a sub-population.
+        Selects two parents from a sub-population. The parents are drawn without replacement, so they are always
+        distinct objects: create_population and replace only ever put new Individual objects into the population,
+        even when two of them happen to hold the same assignment.
         :return: Two individuals child_x and child_y
         """
         self.sub_population = self.population[0:self.sub_population_size]
-        child_x, child_y = random.sample(self.sub_population, 2)
+        child_x, child_y = self._rng.sample(self.sub_population, 2)
         return child_x, child_y
 
     def create_population(self):
@@ -655,17 +1184,25 @@ class GA:
         :return: void (no return value)
         """
 
-        self.population = Factory.create(self.numberOfVariables, self.population_size)
+        # population_size individuals and as many again, all drawn in one batch
+        self.population = Factory.create(self.numberOfVariables, 2 * self.population_size, self._np_rng)
         # Initial sort of the population. This also calls evaluate and therefore every individual has a stored
-        # fitness value
-        self.population.sort(key=self.evaluate)
-        individual_counter = 0
-        while individual_counter < self.population_size:
-            self.population.append(Individual(self.numberOfVariables, False))
-            individual_counter = individual_counter + 1
+        # fitness value. From here on replace keeps the population sorted.
+        self.sort_population()
 
         return
 
+    def sort_population(self):
+        """
+        Evaluates every individual of the population in one batch and sorts the population by fitness.
+        :return: The sorted fitness values.
+        """
+        # Every individual now holds its fitness, so the sort only needs the array of fitness values
+        fitness_values = np.array(self.evaluate_population(self.population), dtype=np.int64)
+        order = np.argsort(fitness_values, kind='stable')
+        self.population = [self.population[i] for i in order.tolist()]
+        return fitness_values[order].tolist()
+
     def is_satisfied(self):
         """
         Determines whether or not there is a satisfying assignment.
@@ -687,15 +1224,15 @@ class GA:
         child. If the child is worse than the weakest individual, then no replacement is done.
         :return: void (NONE)
         """
-        # Change this to get rid of the sort - Do an insertion sort
-        # self.population.sort(key=operator.attrgetter("fitness"))
-        self.population.sort(key=self.evaluate)
+        # The population is kept sorted by fitness, so rather than sorting it again the child is inserted at its rank
+        # after removing the last individual
+        child_fitness = self.evaluate(child)
+        if self.population[0].fitness > child_fitness:
+            self.population.pop()
+            fitness_values = [individual.fitness for individual in self.population]
+            self.population.insert(bisect.bisect_right(fitness_values, child_fitness), child)
         self.best_individual_fitness = self.population[0].fitness
         self.best_individual = self.population[0]
-        if self.population[0].fitness > child.fitness:
-            # self.population.remove(self.population[len(self.population)-1])
-            # self.population.append(child)
-            self.population[-1] = child
 
         # if self.sub_population[-1].fitness > child.fitness:
         #     return
@@ -710,8 +1247,19 @@ class GA:
 
     def gasat(self):
         """
-        The GASAT algorithm
-        :return:
+        The GASAT algorithm. The thread pool is shut down once it returns or is stopped.
+        :return: The best individual of the final population.
+        """
+
+        try:
+            return self._gasat()
+        finally:
+            self.shutdown()
+
+    def _gasat(self):
+        """
+        The GASAT algorithm, see gasat.
+        :return: The best individual of the final population.
         """
 
         # The GASAT Algorithm
@@ -749,19 +1297,37 @@ class GA:
             # Increase the generation
             self.generation_counter = self.generation_counter + 1
 
+        # The observer always hears of the generation the run ended on, also when it ended early on a solution
+        if self._notified_generation != self._generation_counter:
+            self._notify()
         return self.population[0]
 
+    def shutdown(self):
+        """
+        Shuts down the thread pool that evaluates the population, if it was started. A later evaluation starts a
+        new one.
+        :return: void (no return value)
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
     def attach(self, observer):
+        # Attaching an observer replaces the previous one
+        if self._observer is not None:
+            self._observer._subject = None
         observer._subject = self
-        self._observers.add(observer)
+        self._observer = observer
 
     def detach(self, observer):
         observer._subject = None
-        self._observers.discard(observer)
+        if self._observer is observer:
+            self._observer = None
 
     def _notify(self):
-        for observer in self._observers:
-            observer.update(self._generation_counter)
+        self._notified_generation = self._generation_counter
+        if self._observer is not None:
+            self._observer.update(self._generation_counter)
 
     @property
     def generation_counter(self):
@@ -770,5 +1336,14 @@ class GA:
     @generation_counter.setter
     def generation_counter(self, arg):
         self._generation_counter = arg
-        if arg >= 0:
+        # Observers hear of every notify_every-th generation, at most once per notify_interval seconds, and always of
+        # the last one (gasat also notifies the generation of a run that ends early)
+        if arg < 0:
+            return
+        if arg >= self.max_generations:
             self._notify()
+        elif arg % self.notify_every == 0:
+            now = time.monotonic()
+            if self._last_notified is None or now - self._last_notified >= self.notify_interval:
+                self._last_notified = now
+                self._notify()
@@ -4,6 +4,7 @@
 """
 import json
 from threading import Thread
+from messages import encode
 from SATController import SingletonMixin
 from main import SATController
 
@@ -32,7 +33,8 @@ def decode(data, server, client_id):
 
         required_parameters = ["raw_input", "tabu_list_length", "max_false", "rec", "k"]
         optional_parameters = ["max_generations", "population_size", "sub_population_size", "crossover_operator",
-                               "max_flip", "is_rvcf", "is_diversification", "method"]
+                               "max_flip", "is_rvcf", "is_diversification", "method", "notify_every",
+                               "seed"]
         if set(required_parameters).issubset(list(json_data["SOLVE"].keys())):
             if set(list(json_data["SOLVE"].keys())).issubset(set(required_parameters + optional_parameters)):
                 controller = SATController.instance()
@@ -101,51 +103,3 @@ def decode(data, server, client_id):
     except Exception as e:
         error_response = encode("ERROR", ["A fatal error occurred: " + str(e)])
         server.push_to_one(client_id, error_response)
-
-
-def encode(message_type, data):
-
-    def error(data_arr):
-        return '{"RESPONSE":{"ERROR":"' + str(data_arr[0]) + '"}}#'
-
-    def report_progress(data_arr):
-        response = {
-            "RESPONSE": {
-                "PROGRESS": {
-                    "GENERATION": data_arr[0],
-                    "TIME_STARTED": data_arr[1],
-                    "BEST_INDIVIDUAL_FITNESS": data_arr[2],
-                    "BEST_INDIVIDUAL": data_arr[3],
-                    "CURRENT_CHILD_FITNESS": data_arr[4],
-                    "CURRENT_CHILD": data_arr[5],
-                    "NUM_VARIABLES": data_arr[6],
-                    "NUM_CLAUSES": data_arr[7],
-                    "TRUE_CLAUSES_BEST_INDIVIDUAL": data_arr[8],
-                    "TRUE_CLAUSES_CURRENT_CHILD": data_arr[9]
-                }
-            }
-        }
-        return json.dumps(response) + '#'
-
-    def finished(data_arr):
-        response = {
-            "RESPONSE": {
-                "FINISHED": {
-                    "SUCCESSFUL": data_arr[0],
-                    "FITNESS": data_arr[1],
-                    "GENERATION": data_arr[2],
-                    "TIME_STARTED": data_arr[3],
-                    "TIME_FINISHED": data_arr[4],
-                    "INDIVIDUAL": data_arr[5],
-                    "TRUE_CLAUSES": data_arr[6]
-                }
-            }
-        }
-        return json.dumps(response) + '#'
-
-    options = {
-        "ERROR": error,
-        "PROGRESS": report_progress,
-        "FINISHED": finished
-    }
-    return options[message_type](data)
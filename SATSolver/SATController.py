@@ -1,9 +1,15 @@
 import threading
 import abc
 import time
+import random
+import multiprocessing
+from collections import OrderedDict
+import numpy as np
 from GA import GA
 from GA import GAStop
+from GA import InputError
 from server import BColors
+from messages import encode
 
 
 class SingletonMixin(object):
@@ -25,6 +31,8 @@ class Observer(metaclass=abc.ABCMeta):
     changes in a subject.
     """
 
+    __slots__ = ('_subject', '_generation_count')
+
     def __init__(self):
         self._subject = None
         self._generation_count = None
@@ -34,6 +42,60 @@ class Observer(metaclass=abc.ABCMeta):
         pass
 
 
+class PortfolioObserver(Observer):
+    """
+    Stops the GA of a portfolio worker once another worker has found a solution.
+    """
+
+    __slots__ = ('stop_event',)
+
+    def __init__(self, stop_event):
+        Observer.__init__(self)
+        self.stop_event = stop_event
+
+    def update(self, arg):
+        self._generation_count = arg
+        if self.stop_event.is_set():
+            self._subject.stop = True
+
+
+# The event shared by the workers of a portfolio, set by the first of them to satisfy the formula
+_portfolio_stop_event = None
+
+
+def _init_portfolio_worker(stop_event):
+    """
+    Initialises a worker process of a portfolio.
+    :param stop_event: The multiprocessing.Event shared by the workers.
+    """
+    global _portfolio_stop_event
+    _portfolio_stop_event = stop_event
+
+
+def _run_portfolio_worker(ga_parameters):
+    """
+    Runs one GA of a portfolio in a worker process.
+    :param ga_parameters: The parameters of the GA, including its seed.
+    :return: A tuple of the seed, the crossover operator, the fitness and the string of the best individual found, the
+    number of generations and the time taken in milliseconds.
+    """
+    ga = GA(**ga_parameters)
+    observer = PortfolioObserver(_portfolio_stop_event)
+    ga.attach(observer)
+    time_started = int(time.time()*1000)
+    try:
+        result = ga.gasat()
+    except GAStop:
+        result = ga.best_individual
+    time_elapsed = int(time.time()*1000) - time_started
+    if result is None:
+        return ga.seed, ga_parameters.get('crossover_operator', 0), None, '', ga.generation_counter, time_elapsed
+    if result.fitness == 0:
+        _portfolio_stop_event.set()
+    return (ga.seed, ga_parameters.get('crossover_operator', 0), result.fitness, str(result),
+            ga.generation_counter, time_elapsed)
+
+
 class SATController(Observer, SingletonMixin):
 
     def __init__(self):
@@ -43,42 +105,70 @@ class SATController(Observer, SingletonMixin):
         self.time_started = None
         self.time_finished = None
         self.ga_thread = None
+        # The parameters of the last GA created, which the GAs of a portfolio are derived from
+        self._ga_parameters = None
+        # Progress is printed for every log_every-th progress update received since the run started
+        self.log_every = 1
+        self._updates_received = 0
+        # Start of the run on the monotonic clock, for measuring the elapsed time
+        self._monotonic_started = None
+        # The last clause string computed per role ('best' or 'child'), keyed by the assignment it was computed for
+        self._true_clauses_cache = {}
+        # The fitness cache handed from one GA to the next, kept for as long as the same formula is solved again
+        self._fit_cache = OrderedDict()
+        self._fit_cache_formula = None
+
+    def _true_clauses(self, role, individual):
+        """
+        The true clauses string of an individual (see GA.true_clauses), computed again only when the assignment of the
+        individual in that role has changed since the last update.
+        :param role: 'best' or 'child'.
+        :param individual: The individual, or None.
+        :return: The string of zeros and ones, or '' if there is no individual.
+        """
+        if individual is None:
+            return ''
+        key = individual.bits.tobytes()
+        cached = self._true_clauses_cache.get(role)
+        if cached is None or cached[0] != key:
+            cached = (key, self.GA.true_clauses(individual))
+            self._true_clauses_cache[role] = cached
+        return cached[1]
 
     def update(self, arg):
-        from SATSolver.RequestHandler import encode
         self._generation_count = arg
+        self._updates_received += 1
 
-        if self.GA.best_individual is None:
-            best_true_clauses = ''
-        else:
-            best_true_clauses = self.GA.true_clauses(self.GA.best_individual)
-
-        if self.GA.current_child is None:
-            new_true_clauses = ''
-        else:
-            new_true_clauses = self.GA.true_clauses(self.GA.current_child)
-
-        encoded_message = encode("PROGRESS", [[self._generation_count, self.GA.max_generations],
-                                              [self.time_started],
-                                              [self.GA.best_individual_fitness],
-                                              [str(self.GA.best_individual)],
-                                              [self.GA.current_child_fitness],
-                                              [str(self.GA.current_child)],
-                                              [self.GA.numberOfVariables],
-                                              [self.GA.numberOfClauses],
-                                              [best_true_clauses],
-                                              [new_true_clauses]]
-                                 )
+        # The progress message is only of use to the clients of the server
         if self.server_thread is not None:
+            best_true_clauses = self._true_clauses('best', self.GA.best_individual)
+            new_true_clauses = self._true_clauses('child', self.GA.current_child)
+
+            encoded_message = encode("PROGRESS", [[self._generation_count, self.GA.max_generations],
+                                                  [self.time_started],
+                                                  [self.GA.best_individual_fitness],
+                                                  [str(self.GA.best_individual)],
+                                                  [self.GA.current_child_fitness],
+                                                  [str(self.GA.current_child)],
+                                                  [self.GA.numberOfVariables],
+                                                  [self.GA.numberOfClauses],
+                                                  [best_true_clauses],
+                                                  [new_true_clauses]]
+                                     )
             self.server_thread.push_to_all(encoded_message)
-        time_elapsed = int(time.time()*1000)-self.time_started
-        if time_elapsed >= 1000:
-            time_elapsed = str(time_elapsed/1000) + 's'
-        else:
-            time_elapsed = str(time_elapsed) + 'ms'
-        print("Generations: " + str(self._generation_count) + "/" + str(self.GA.max_generations) + "\t|\tElapsed Time: "
-              + time_elapsed + "\t|\tBest Individual's Fitness: "
-              + str(self.GA.best_individual_fitness))
+        # A poll can arrive before the GA has notified its first generation, or before the run has started
+        if self._generation_count is not None and self._updates_received % self.log_every == 0:
+            if self._monotonic_started is None:
+                time_elapsed = 0
+            else:
+                time_elapsed = (time.monotonic_ns() - self._monotonic_started) // 1000000
+            if time_elapsed >= 1000:
+                time_elapsed = str(time_elapsed/1000) + 's'
+            else:
+                time_elapsed = str(time_elapsed) + 'ms'
+            print("Generations: " + str(self._generation_count) + "/" + str(self.GA.max_generations) +
+                  "\t|\tElapsed Time: " + time_elapsed + "\t|\tBest Individual's Fitness: "
+                  + str(self.GA.best_individual_fitness))
 
     def send_update(self, msg):
         self.server_thread.push_to_all(msg)
@@ -89,12 +179,20 @@ class SATController(Observer, SingletonMixin):
     def create_ga(self, ga_parameters):
 
         new_params = {key: ga_parameters[key] for key in ga_parameters.keys() if ga_parameters[key] is not None}
-        self.GA = GA(**new_params)
+        # Fitness values only carry over between runs on the same formula, compared clause by clause
+        if new_params['formula'] != self._fit_cache_formula:
+            self._fit_cache = OrderedDict()
+            self._fit_cache_formula = list(new_params['formula'])
+        self.GA = GA(fit_cache=self._fit_cache, **new_params)
         self.GA.attach(self)
+        self._true_clauses_cache = {}
+        self._ga_parameters = new_params
 
     def start_ga(self):
         try:
             self.time_started = int(time.time()*1000)
+            self._monotonic_started = time.monotonic_ns()
+            self._updates_received = 0
             result = self.GA.gasat()
             self.time_finished = int(time.time()*1000)
             time_elapsed = self.time_finished - self.time_started
@@ -110,11 +208,10 @@ class SATController(Observer, SingletonMixin):
                 print(BColors.FAIL + "Could not find a solution in the given amount of generations." + BColors.ENDC)
                 print('The best solution found is: ' + str(result))
             if self.server_thread is not None:
-                from SATSolver.RequestHandler import encode
                 encoded_message = encode("FINISHED", [
                     result.fitness == 0,
                     result.fitness,
-                    [self._generation_count, self.GA.max_generations],
+                    [self.GA.generation_counter, self.GA.max_generations],
                     self.time_started,
                     self.time_finished,
                     str(result),
@@ -136,7 +233,6 @@ class SATController(Observer, SingletonMixin):
             if self.GA.best_individual is None:
                 print(BColors.FAIL + "Could not find a solution, solving stopped by client." + BColors.ENDC)
                 if self.server_thread is not None:
-                    from SATSolver.RequestHandler import encode
                     encoded_message = encode("FINISHED", [
                         False,
                         None,
@@ -159,11 +255,10 @@ class SATController(Observer, SingletonMixin):
                 print(BColors.FAIL + "Could not find a solution, solving stopped by client." + BColors.ENDC)
                 print('The best solution found is: ' + str(result))
             if self.server_thread is not None:
-                from SATSolver.RequestHandler import encode
                 encoded_message = encode("FINISHED", [
                     result.fitness == 0,
                     result.fitness,
-                    [self._generation_count, self.GA.max_generations],
+                    [self.GA.generation_counter, self.GA.max_generations],
                     self.time_started,
                     self.time_finished,
                     str(self.GA.best_individual),
@@ -173,6 +268,58 @@ class SATController(Observer, SingletonMixin):
 
                 self.GA = None
 
+    def start_ga_portfolio(self, k):
+        """
+        Races k GAs on the formula of the current GA, each in its own process with its own seed and crossover
+        operator. The first to satisfy the formula stops the others.
+        :param k: The number of GAs.
+        :return: The tuple returned by the winning worker (see _run_portfolio_worker), i.e. the first to satisfy the
+        formula or otherwise the one with the best fitness.
+        """
+        if self._ga_parameters is None:
+            raise InputError("Input Error! A GA must be created with create_ga before a portfolio can be started.")
+        if not int(k) > 0:
+            raise InputError("Input Error! The number of GAs in a portfolio must be > 0!")
+        base_operator = self._ga_parameters.get('crossover_operator', 0)
+        base_seed = self._ga_parameters.get('seed')
+        if base_seed is None:
+            base_seed = random.randrange(2 ** 32)
+        # The workers already run in parallel, so each evaluates its population on a single thread
+        jobs = [dict(self._ga_parameters, seed=base_seed + i, crossover_operator=(base_operator + i) % 3, workers=1)
+                for i in range(k)]
+
+        # Spawned rather than forked workers, as the parent may be running server threads
+        context = multiprocessing.get_context("spawn")
+        stop_event = context.Event()
+        self.time_started = int(time.time()*1000)
+        self._monotonic_started = time.monotonic_ns()
+        with context.Pool(k, initializer=_init_portfolio_worker, initargs=(stop_event,)) as pool:
+            results = []
+            for result in pool.imap_unordered(_run_portfolio_worker, jobs):
+                results.append(result)
+                if result[2] == 0:
+                    break
+        self.time_finished = int(time.time()*1000)
+
+        finished = [result for result in results if result[2] is not None]
+        if not finished:
+            print(BColors.FAIL + "Could not find a solution, solving stopped." + BColors.ENDC)
+            return None
+        winner = min(finished, key=lambda result: result[2])
+        seed, crossover_operator, fitness, individual, generations, time_elapsed = winner
+        if time_elapsed >= 1000:
+            time_elapsed = str(time_elapsed / 1000) + 's'
+        else:
+            time_elapsed = str(time_elapsed) + 'ms'
+        if fitness == 0:
+            print(BColors.OKGREEN + "Successfully found a solution in " + time_elapsed + " (seed " + str(seed) +
+                  ", crossover operator " + str(crossover_operator) + ")" + BColors.ENDC)
+            print('A solution is: ' + individual)
+        else:
+            print(BColors.FAIL + "Could not find a solution in the given amount of generations." + BColors.ENDC)
+            print('The best solution found is: ' + individual)
+        return winner
+
     def parse_formula(self, raw_formula, local=True):
         """
         Takes a list of lines read from the input file and
@@ -184,29 +331,31 @@ class SATController(Observer, SingletonMixin):
         else:
             number_of_variables, number_of_clauses = int(raw_formula[0].split()[2]), int(raw_formula[0].split()[3])
             lines = raw_formula
-        formula = []
-
-        # Go through the lines and create numberOfClauses clauses
-        line = 1
-        # for line in range(1, len(lines)):
+        # Tokenize the whole body at once, a clause may be split over many lines but always ends with a 0
         try:
-            while line < len(lines):
-                clause = []
-                # We need a while loop as a clause may be split over many lines, but eventually ends with a 0
-                end_of_clause = False
-                while line < len(lines) and not end_of_clause:
-                    # Split the line and append a list of all integers, excluding 0, to clause
-                    clause.append([int(variable.strip()) for variable in lines[line].split()
-                                   if int(variable.strip()) != 0])
-                    # If this line ended with a 0, we reached the end of the clause
-                    if int(lines[line].split()[-1].strip()) == 0:
-                        end_of_clause = True
-                        line += 1
-                    # Otherwise continue reading this clause from the next line
-                    else:
-                        line += 1
-                # clause is now a list of lists, so we need to flatten it and convert it to a list
-                formula.append(tuple([item for sublist in clause for item in sublist]))
-        except Exception as e:
+            tokens = np.asarray(" ".join(lines[1:]).split(), dtype=np.int64)
+        except ValueError as e:
+            line = next(line for line in range(1, len(lines)) if not self._is_clause_line(lines[line]))
             raise Exception(str(line) + ' ' + str(e))
+        ends = np.flatnonzero(tokens == 0)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        literals = tokens.tolist()
+        formula = [tuple(literals[start:end]) for start, end in zip(starts.tolist(), ends.tolist())]
+        # A last clause that is not terminated by a 0 runs to the end of the input
+        last = ends[-1] + 1 if len(ends) else 0
+        if last < len(literals):
+            formula.append(tuple(literals[last:]))
         return formula, number_of_variables, number_of_clauses
+
+    @staticmethod
+    def _is_clause_line(line):
+        """
+        Whether every token of a line is an integer literal.
+        :param line: A line of the body of a DIMACS file.
+        :return: True if the line can be tokenized.
+        """
+        try:
+            [int(token) for token in line.split()]
+        except ValueError:
+            return False
+        return True
@@ -4,43 +4,197 @@
     an Individual for use in the genetic algorithm.
 """
 
-from bitarray import bitarray
+import numpy as np
 import random
 
+# Translation tables between the characters of a bit string and the bytes of Individual.data
+_FROM_01 = bytes.maketrans(b'01', b'\x00\x01')
+_TO_01 = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def _random_words(count, rng=None):
+
+    """ Draws count uint64 words of random bits from rng, a random.Random, or else from the random module. """
+
+    source = random if rng is None else rng
+    return np.frombuffer(source.getrandbits(64 * count).to_bytes(8 * count, 'little'), dtype=np.uint64).copy()
+
 
 class Individual:
     """ Encapsulates an Individual in the GA. """
 
-    def __init__(self, length=0, value=None, parents=None):
+    # A population holds many individuals, so they do without a per-instance __dict__
+    __slots__ = ('length', 'fitness', 'isCacheValid', '_bits', '_words', '_data', '_string', 'true_counts', 'num_unsat')
+
+    def __init__(self, length=0, value=None, parents=None, rng=None):
 
         """ Creates a bit string of a certain length, using a certain underlying
         implementation.
 
+        :param value: Optional initial bit string as accepted by data, e.g. "0110", which also sets the length
         :param parents: A 2-tuple of the parents to initialise this child from
+        :param rng: Optional random.Random to draw the random bits from, instead of the random module
 
         """
 
         self.length = length
         self.fitness = 100
         self.isCacheValid = False
-        self.data = bitarray(length)
+        # The bit string packed into uint64 words: position b is stored in bit (b-1) & 63 of word (b-1) >> 6. _words is
+        # a memoryview of the same memory, whose items are read and written as Python ints for single bit access.
+        self._bits = None
+        self._words = None
+        # The same bit string with a byte per position, built on demand and None whenever it is out of date
+        self._data = None
+        # The bit string as returned by str, built on demand and None whenever it is out of date
+        self._string = None
+        # Number of true literals per clause and the number of clauses without any, kept up to date by
+        # flip_incremental. Filled in by the GA on demand, None whenever it is out of date.
+        self.true_counts = None
+        self.num_unsat = None
 
+        if value is not None:
+            self.data = value
+            return
+        choice = _random_words((length + 63) // 64, rng)
         if parents is not None:
-            for i in range(1, length+1):
-                if (bool(random.getrandbits(1))):
-                    self.set(i, parents[0].get(i))
-                else:
-                    self.set(i, parents[1].get(i))
+            # Every bit is taken from either parent with equal probability
+            first, second = (self._fit(parent.bits) for parent in parents)
+            self._store((first & choice) | (second & ~choice))
         else:
-            for i in range(1, length+1):
-                if bool(random.getrandbits(1)):
-                    self.flip(i)
+            self._store(choice)
 
     def __str__(self):
 
         """ Creates a consistent string method across implementations. """
 
-        return self.data.to01()
+        if self._string is None:
+            self._string = self.data.translate(_TO_01).decode('ascii')
+        return self._string
+
+    def __getstate__(self):
+
+        """ The state for pickling and copying. The memoryview cannot be pickled, it is rebuilt from the words. """
+
+        return {name: getattr(self, name) for name in self.__slots__ if name != '_words'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._words = self._bits.data
+
+    def _fit(self, words):
+
+        """ Pads or truncates words to the number of words of this individual. """
+
+        fitted = np.zeros((self.length + 63) // 64, dtype=np.uint64)
+        width = min(len(words), len(fitted))
+        fitted[:width] = words[:width]
+        return fitted
+
+    def _store(self, words):
+
+        """ Replaces the bit string by the given words, clearing the bits beyond the length. """
+
+        self._bits = self._fit(words)
+        if self.length & 63:
+            self._bits[-1] &= np.uint64((1 << (self.length & 63)) - 1)
+        self._words = self._bits.data
+        self._data = None
+        self._string = None
+        self.isCacheValid = False
+        self.true_counts = None
+
+    @property
+    def data(self):
+
+        """ The bit string as bytes holding a 0 or 1 per position, where position b is stored at index b-1. Assign a
+        string of "0" and "1" characters, bytes like these or any sequence of truth values to data to replace the bit
+        string and its length. """
+
+        if self._data is None:
+            self._data = np.unpackbits(self._bits.view(np.uint8), count=self.length, bitorder='little').tobytes()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        if isinstance(value, str):
+            value = value.encode('ascii').translate(_FROM_01)
+        if isinstance(value, (bytes, bytearray)):
+            value = np.frombuffer(value, dtype=np.uint8)
+        value = np.asarray(value, dtype=np.bool_)
+        self.length = len(value)
+        packed = np.zeros((self.length + 63) // 64 * 8, dtype=np.uint8)
+        packed[:(self.length + 7) // 8] = np.packbits(value, bitorder='little')
+        self._store(packed.view(np.uint64))
+
+    @property
+    def bits(self):
+
+        """ The assignment packed into a contiguous uint64 array. Position b is stored in bit (b-1) & 63 of
+        word (b-1) >> 6, the remaining high bits of the last word are always zero. It must not be modified in place,
+        assign to bits instead. """
+
+        return self._bits
+
+    @bits.setter
+    def bits(self, words):
+        self._store(np.asarray(words, dtype=np.uint64))
+
+    @classmethod
+    def from_bits(cls, length, words):
+
+        """ Creates an individual of a certain length from packed words as in bits, without the random initialisation.
+
+        :param words: uint64 array of at least (length + 63) // 64 words, the bits beyond length are ignored
+
+        """
+
+        individual = cls.__new__(cls)
+        individual.length = length
+        individual.fitness = 100
+        individual.num_unsat = None
+        individual.bits = words
+        return individual
+
+    @classmethod
+    def view(cls, length, words):
+
+        """ Creates an individual of a certain length on top of packed words, without copying them. The individual
+        writes its bits into words from then on, so words must not be shared with any other individual.
+
+        :param words: uint64 array of exactly (length + 63) // 64 words with the bits beyond length cleared
+
+        """
+
+        individual = cls.__new__(cls)
+        individual.length = length
+        individual.fitness = 100
+        individual.isCacheValid = False
+        individual._bits = words
+        individual._words = words.data
+        individual._data = None
+        individual._string = None
+        individual.true_counts = None
+        individual.num_unsat = None
+        return individual
+
+    def clone(self):
+
+        """ Returns an independent copy of this individual, including its cached fitness. """
+
+        twin = Individual.__new__(Individual)
+        twin.length = self.length
+        twin.fitness = self.fitness
+        twin.isCacheValid = self.isCacheValid
+        twin._bits = self._bits.copy()
+        twin._words = twin._bits.data
+        # The bytes of data are immutable, so they can be shared until either side changes
+        twin._data = self._data
+        twin._string = self._string
+        twin.true_counts = None if self.true_counts is None else self.true_counts.copy()
+        twin.num_unsat = self.num_unsat
+        return twin
 
     def __call__(self, b):
         return self.get(b)
@@ -52,7 +206,7 @@ class Individual:
         b -= 1
         if b >= self.length or b < 0:
             return
-        return int(self.data[b])
+        return (self._words[b >> 6] >> (b & 63)) & 1
 
     def set(self, b, v):
 
@@ -62,7 +216,13 @@ class Individual:
         b -= 1
         if b >= self.length or b < 0:
             return
-        self.data[b] = bool(v)
+        self._data = None
+        self._string = None
+        self.true_counts = None
+        if v:
+            self._words[b >> 6] |= 1 << (b & 63)
+        else:
+            self._words[b >> 6] &= ~(1 << (b & 63)) & 0xFFFFFFFFFFFFFFFF
 
     def flip(self, b):
 
@@ -72,15 +232,56 @@ class Individual:
         b -= 1
         if b >= self.length or b < 0:
             return
-        self.data[b] = not self.data[b]
+        self._data = None
+        self._string = None
+        self.true_counts = None
+        self._words[b >> 6] ^= 1 << (b & 63)
+
+    def flip_incremental(self, b, pos_clauses, neg_clauses):
+
+        """ Flips the bit at position b and updates true_counts, num_unsat and the cached fitness in O(deg(b)).
+
+        :param pos_clauses: Indices of the clauses in which b occurs as a positive literal
+        :param neg_clauses: Indices of the clauses in which b occurs as a negated literal
+
+        """
+
+        b -= 1
+        if b >= self.length or b < 0:
+            return
+        # A true atom takes its positive literals from true to false and its negated literals the other way round
+        if (self._words[b >> 6] >> (b & 63)) & 1:
+            losing, gaining = pos_clauses, neg_clauses
+        else:
+            losing, gaining = neg_clauses, pos_clauses
+        counts = self.true_counts
+        counts[losing] -= 1
+        counts[gaining] += 1
+        self.num_unsat += int(np.count_nonzero(counts[losing] == 0)) - int(np.count_nonzero(counts[gaining] == 1))
+        self._data = None
+        self._string = None
+        self._words[b >> 6] ^= 1 << (b & 63)
+        self.fitness = self.num_unsat
+        self.isCacheValid = True
 
 
 class Factory:
     """ A factory class for creating individuals in bulk. """
 
     @staticmethod
-    def create(length, amount):
-        """ Creates an array of individuals. """
+    def create(length, amount, rng=None):
+        """ Creates an array of individuals.
+
+        :param rng: Optional numpy.random.Generator to draw the bits from
+
+        """
 
-        array = [Individual(length=length) for _ in range(amount)]
+        if rng is None:
+            rng = np.random.default_rng()
+        # Draw the random bits of all the individuals at once, every individual keeps its own row of the matrix
+        words = rng.integers(0, np.iinfo(np.uint64).max, size=(amount, (length + 63) // 64), dtype=np.uint64,
+                             endpoint=True)
+        if length & 63:
+            words[:, -1] &= np.uint64((1 << (length & 63)) - 1)
+        array = [Individual.view(length, row) for row in words]
         return array
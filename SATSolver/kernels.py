@@ -0,0 +1,273 @@
+"""
+    Module: Kernels
+    Description: Compiled versions of the clause evaluation loops of the genetic algorithm. Numba is an optional
+    dependency: without it the functions stay plain Python and the GA uses its NumPy implementations instead.
+    The kernels release the GIL, so individuals can be evaluated on several threads at once. The parallel kernels
+    instead split the clauses of a single evaluation over Numba's own threads, which pays off on very large formulas.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """ Stand-in for numba.njit that leaves the decorated function as it is. """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True, nogil=True)
+def bit_value(bits, variable):
+    """
+    The value of a variable in a packed assignment.
+    :param bits: uint64 array as in Individual.bits.
+    :param variable: The variable (starts at 1 - as per DIMACS format).
+    :return: True if the variable is set.
+    """
+    position = variable - 1
+    return ((bits[position >> 6] >> np.uint64(position & 63)) & np.uint64(1)) != 0
+
+
+@njit(cache=True, nogil=True)
+def satisfaction_kernel(bits, lit_flat, lit_start):
+    """
+    sat (X,c) for every clause of a formula stored as flat literals, clause c being
+    lit_flat[lit_start[c]:lit_start[c+1]].
+    :return: boolean array where entry c indicates whether clause c is satisfied.
+    """
+    satisfied = np.zeros(len(lit_start) - 1, dtype=np.bool_)
+    for c in range(len(lit_start) - 1):
+        for i in range(lit_start[c], lit_start[c + 1]):
+            if bit_value(bits, abs(lit_flat[i])) == (lit_flat[i] > 0):
+                satisfied[c] = True
+                break
+    return satisfied
+
+
+@njit(cache=True, nogil=True)
+def evaluate_kernel(bits, lit_flat, lit_start, bound):
+    """
+    The number of clauses of a formula stored as flat literals that are not satisfied by the assignment.
+    :param bound: Counting stops as soon as more than bound clauses are unsatisfied.
+    :return: The number of unsatisfied clauses, or bound + 1 if there are more than bound.
+    """
+    unsatisfied = 0
+    for c in range(len(lit_start) - 1):
+        satisfied = False
+        for i in range(lit_start[c], lit_start[c + 1]):
+            if bit_value(bits, abs(lit_flat[i])) == (lit_flat[i] > 0):
+                satisfied = True
+                break
+        if not satisfied:
+            unsatisfied += 1
+            if unsatisfied > bound:
+                break
+    return unsatisfied
+
+
+@njit(cache=True, nogil=True)
+def degree_kernel(bits, lit_flat, lit_start):
+    """
+    The degree (number of true literals) of every clause of a formula stored as flat literals.
+    :return: int32 array where entry c is the degree of clause c.
+    """
+    degrees = np.zeros(len(lit_start) - 1, dtype=np.int32)
+    for c in range(len(lit_start) - 1):
+        for i in range(lit_start[c], lit_start[c + 1]):
+            if bit_value(bits, abs(lit_flat[i])) == (lit_flat[i] > 0):
+                degrees[c] += 1
+    return degrees
+
+
+@njit(cache=True, nogil=True)
+def improvement_kernel(true_counts, losing, gaining):
+    """
+    The improvement of a flip given the true literal counts of the clauses.
+    :param losing: Clauses in which the flipped variable's literal goes from true to false.
+    :param gaining: Clauses in which the flipped variable's literal goes from false to true.
+    :return: The number of clauses made true minus the number of clauses made false.
+    """
+    improvement = 0
+    for c in gaining:
+        if true_counts[c] == 0:
+            improvement += 1
+    for c in losing:
+        if true_counts[c] == 1:
+            improvement -= 1
+    return improvement
+
+
+@njit(cache=True, nogil=True)
+def gains_kernel(bits, true_counts, lit_clause, lit_var, lit_sign, size):
+    """
+    The improvement of flipping each variable, from the true literal counts and the flat literal arrays.
+    :return: int64 array of length size where entry v is the improvement of flipping v.
+    """
+    gains = np.zeros(size, dtype=np.int64)
+    for i in range(len(lit_clause)):
+        count = true_counts[lit_clause[i]]
+        if count == 0:
+            gains[lit_var[i]] += 1
+        elif count == 1 and bit_value(bits, lit_var[i]) == lit_sign[i]:
+            gains[lit_var[i]] -= 1
+    return gains
+
+
+@njit(cache=True, nogil=True)
+def literal_k3_values(bits, words, shifts, flips, c):
+    """
+    The values of the three literals of clause c packed as the lowest bits of one word, computed without branches:
+    the bit of each atom is shifted down and inverted for a negated literal.
+    :param words: (clauses x 3) array with the word of Individual.bits holding the atom of every literal.
+    :param shifts: (clauses x 3) uint64 array with the position of that atom within its word.
+    :param flips: (clauses x 3) uint64 array, 1 for a negated literal and 0 otherwise.
+    :return: uint64 whose lowest bit is set if the clause is satisfied.
+    """
+    return (((bits[words[c, 0]] >> shifts[c, 0]) ^ flips[c, 0]) | ((bits[words[c, 1]] >> shifts[c, 1]) ^ flips[c, 1])
+            | ((bits[words[c, 2]] >> shifts[c, 2]) ^ flips[c, 2])) & np.uint64(1)
+
+
+@njit(cache=True, nogil=True)
+def satisfaction_k3_kernel(bits, words, shifts, flips):
+    """
+    satisfaction_kernel specialised for formulas in which every clause has exactly three literals, see
+    literal_k3_values for the layout of the clauses.
+    """
+    satisfied = np.zeros(words.shape[0], dtype=np.bool_)
+    for c in range(words.shape[0]):
+        satisfied[c] = literal_k3_values(bits, words, shifts, flips, c) != 0
+    return satisfied
+
+
+@njit(cache=True, nogil=True)
+def evaluate_k3_kernel(bits, words, shifts, flips, bound):
+    """
+    evaluate_kernel specialised for formulas in which every clause has exactly three literals, see
+    literal_k3_values for the layout of the clauses.
+    """
+    unsatisfied = 0
+    for c in range(words.shape[0]):
+        unsatisfied += 1 - literal_k3_values(bits, words, shifts, flips, c)
+        if unsatisfied > bound:
+            break
+    return unsatisfied
+
+
+@njit(cache=True, nogil=True)
+def evaluate_population_kernel(matrix, lit_flat, lit_start):
+    """
+    evaluate_kernel for several assignments at once.
+    :param matrix: (individuals x words) uint64 array, one packed assignment per row.
+    :return: int64 array with the number of unsatisfied clauses of every row.
+    """
+    unsatisfied = np.zeros(matrix.shape[0], dtype=np.int64)
+    for r in range(matrix.shape[0]):
+        unsatisfied[r] = evaluate_kernel(matrix[r], lit_flat, lit_start, len(lit_start))
+    return unsatisfied
+
+
+@njit(cache=True, nogil=True)
+def evaluate_population_k3_kernel(matrix, words, shifts, flips):
+    """
+    evaluate_k3_kernel for several assignments at once.
+    :param matrix: (individuals x words) uint64 array, one packed assignment per row.
+    :return: int64 array with the number of unsatisfied clauses of every row.
+    """
+    unsatisfied = np.zeros(matrix.shape[0], dtype=np.int64)
+    for r in range(matrix.shape[0]):
+        unsatisfied[r] = evaluate_k3_kernel(matrix[r], words, shifts, flips, words.shape[0])
+    return unsatisfied
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def satisfaction_parallel_kernel(bits, lit_flat, lit_start):
+    """
+    satisfaction_kernel with the clauses divided over Numba's threads.
+    """
+    satisfied = np.zeros(len(lit_start) - 1, dtype=np.bool_)
+    for c in prange(len(lit_start) - 1):
+        for i in range(lit_start[c], lit_start[c + 1]):
+            if bit_value(bits, abs(lit_flat[i])) == (lit_flat[i] > 0):
+                satisfied[c] = True
+                break
+    return satisfied
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def evaluate_parallel_kernel(bits, lit_flat, lit_start):
+    """
+    evaluate_kernel with the clauses divided over Numba's threads. It always counts every unsatisfied clause.
+    """
+    unsatisfied = 0
+    for c in prange(len(lit_start) - 1):
+        satisfied = False
+        for i in range(lit_start[c], lit_start[c + 1]):
+            if bit_value(bits, abs(lit_flat[i])) == (lit_flat[i] > 0):
+                satisfied = True
+                break
+        if not satisfied:
+            unsatisfied += 1
+    return unsatisfied
+
+
+# The kernels generated by uniform_kernels, keyed by clause width and whether the assignment fits in a single word
+_uniform_kernels = {}
+
+_UNIFORM_SOURCE = '''
+def satisfaction(bits, words, shifts, flips):
+    satisfied = np.zeros(words.shape[0], dtype=np.bool_)
+    {setup}
+    for c in range(words.shape[0]):
+        satisfied[c] = ({value}) & np.uint64(1) != 0
+    return satisfied
+
+
+def evaluate(bits, words, shifts, flips, bound):
+    unsatisfied = 0
+    {setup}
+    for c in range(words.shape[0]):
+        unsatisfied += 1 - (({value}) & np.uint64(1))
+        if unsatisfied > bound:
+            break
+    return unsatisfied
+
+
+def evaluate_population(matrix, words, shifts, flips):
+    unsatisfied = np.zeros(matrix.shape[0], dtype=np.int64)
+    for r in range(matrix.shape[0]):
+        unsatisfied[r] = evaluate(matrix[r], words, shifts, flips, words.shape[0])
+    return unsatisfied
+'''
+
+
+def uniform_kernels(width, single_word=False):
+    """
+    Kernels for formulas in which every clause has exactly width literals, generated with the loop over the literals
+    of a clause unrolled as in literal_k3_values. When the assignment fits in a single word, that word is read once
+    instead of looking up the word of every literal. The kernels are compiled on their first call and kept for the
+    rest of the process, the hand-written 3-SAT kernels being returned for wide assignments as they are cached on disk.
+    :param width: The number of literals of every clause.
+    :param single_word: True if the assignments have a single word.
+    :return: (satisfaction, evaluate, evaluate_population) kernels, taking the same arguments as
+    satisfaction_k3_kernel, evaluate_k3_kernel and evaluate_population_k3_kernel.
+    """
+    if width == 3 and not single_word:
+        return satisfaction_k3_kernel, evaluate_k3_kernel, evaluate_population_k3_kernel
+    key = (width, single_word)
+    if key not in _uniform_kernels:
+        word = "word" if single_word else "bits[words[c, {0}]]"
+        value = " | ".join(("((" + word + " >> shifts[c, {0}]) ^ flips[c, {0}])").format(i) for i in range(width))
+        source = _UNIFORM_SOURCE.format(setup="word = bits[0]" if single_word else "pass", value=value)
+        namespace = {"np": np}
+        exec(source, namespace)
+        # evaluate_population calls the compiled evaluate through the namespace
+        for name in ("satisfaction", "evaluate", "evaluate_population"):
+            namespace[name] = njit(nogil=True)(namespace[name])
+        _uniform_kernels[key] = namespace["satisfaction"], namespace["evaluate"], namespace["evaluate_population"]
+    return _uniform_kernels[key]
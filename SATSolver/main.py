@@ -64,6 +64,17 @@ def main(argv):
         parser.add_option("--diversification", dest="is_diversification", type="int",
                           help="A mechanism to help flip the last few stubborn false clauses -  "
                                "0 for False; 1 for True.")
+        parser.add_option("--notify-every", dest="notify_every", type="int",
+                          help="The number of generations between progress updates (default: a 200th of the "
+                               "maximum generations).", metavar="<notify every>")
+        parser.add_option("--log-every", dest="log_every", type="int",
+                          help="The number of progress updates between printed progress lines.",
+                          metavar="<log every>")
+        parser.add_option("--seed", dest="seed", type="int",
+                          help="Seed for the random number generators of the GA, which makes a run repeatable.",
+                          metavar="<seed>")
+        parser.add_option("--portfolio", dest="portfolio", type="int",
+                          help="Race this many differently seeded GAs in separate processes.", metavar="<k>")
 
         (options, args) = parser.parse_args()
         options = vars(options)
@@ -74,8 +85,13 @@ def main(argv):
         f = open(options['file'], "r")
         formula, number_of_variables, number_of_clauses = controller.parse_formula(f.readlines())
         port_number = options['port']
+        portfolio = options['portfolio']
+        if options['log_every'] is not None:
+            controller.log_every = options['log_every']
         del options['port']
         del options['file']
+        del options['portfolio']
+        del options['log_every']
         options['formula'] = formula
         options['number_of_variables'] = number_of_variables
         options['number_of_clauses'] = number_of_clauses
@@ -87,7 +103,10 @@ def main(argv):
                 # Close Server
                 pass
             return
-        controller.start_ga()
+        if portfolio is not None:
+            controller.start_ga_portfolio(portfolio)
+        else:
+            controller.start_ga()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,54 @@
+"""
+    Module: Messages
+    Description: Encodes the messages sent from the server to its clients. Kept apart from the request handler so that
+    the controller can encode its messages without importing the request handler, which imports the controller.
+"""
+import json
+
+
+def encode(message_type, data):
+
+    def error(data_arr):
+        return '{"RESPONSE":{"ERROR":"' + str(data_arr[0]) + '"}}#'
+
+    def report_progress(data_arr):
+        response = {
+            "RESPONSE": {
+                "PROGRESS": {
+                    "GENERATION": data_arr[0],
+                    "TIME_STARTED": data_arr[1],
+                    "BEST_INDIVIDUAL_FITNESS": data_arr[2],
+                    "BEST_INDIVIDUAL": data_arr[3],
+                    "CURRENT_CHILD_FITNESS": data_arr[4],
+                    "CURRENT_CHILD": data_arr[5],
+                    "NUM_VARIABLES": data_arr[6],
+                    "NUM_CLAUSES": data_arr[7],
+                    "TRUE_CLAUSES_BEST_INDIVIDUAL": data_arr[8],
+                    "TRUE_CLAUSES_CURRENT_CHILD": data_arr[9]
+                }
+            }
+        }
+        return json.dumps(response) + '#'
+
+    def finished(data_arr):
+        response = {
+            "RESPONSE": {
+                "FINISHED": {
+                    "SUCCESSFUL": data_arr[0],
+                    "FITNESS": data_arr[1],
+                    "GENERATION": data_arr[2],
+                    "TIME_STARTED": data_arr[3],
+                    "TIME_FINISHED": data_arr[4],
+                    "INDIVIDUAL": data_arr[5],
+                    "TRUE_CLAUSES": data_arr[6]
+                }
+            }
+        }
+        return json.dumps(response) + '#'
+
+    options = {
+        "ERROR": error,
+        "PROGRESS": report_progress,
+        "FINISHED": finished
+    }
+    return options[message_type](data)
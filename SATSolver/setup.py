@@ -11,7 +11,7 @@ setup(
     author_email='imperium@dearvolt.com',
     description='',
     install_requires=[
-        'bitarray',
-        'pympler'
+        'pympler',
+        'numpy'
       ]
 )
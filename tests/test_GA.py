@@ -1,13 +1,15 @@
 import sys
 import os
+import random
+from collections import OrderedDict
 
 myPath = os.path.dirname(os.path.abspath(__file__))
 print(myPath)
 sys.path.insert(0, myPath + '/../SATSolver')
 from GA import GA
-from unittest import TestCase
+import kernels
+from unittest import TestCase, skipUnless
 from individual import Individual
-from bitarray import bitarray
 
 
 class TestGA(TestCase):
@@ -45,42 +47,203 @@ class TestGA(TestCase):
 
     def test_sat(self):
         ind = Individual(9)
-        ind.data = bitarray("000100000")
+        ind.data = "000100000"
         self.assertEqual(GA.sat(ind, [9, -5]), True)
         self.assertEqual(GA.sat(ind, [1, 3, 6]), False)
-        ind.data = bitarray("111111111")
+        ind.data = "111111111"
         self.assertEqual(GA.sat(ind, [-6, -4]), False)
 
     def test_evaluate(self):
         reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga = GA(reader.formula, 5, 9, 5, 9, 5, 5)
         ind = Individual(9)
-        ind.data = bitarray("111111111")
+        ind.data = "111111111"
         ind.isCacheValid = False
         self.assertEqual(ga.evaluate(ind), 1)
-        ind.data = bitarray("111111110")
+        ind.data = "111111110"
         ind.isCacheValid = False
         self.assertEqual(ga.evaluate(ind), 2)
 
+    def test_evaluate_bitmask(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        for _ in range(10):
+            ind = Individual(324)
+            ga.use_bitmask = True
+            ind.isCacheValid = False
+            bitmask_fitness = ga.evaluate(ind)
+            ga.use_bitmask = False
+            ind.isCacheValid = False
+            self.assertEqual(bitmask_fitness, ga.evaluate(ind))
+            self.assertEqual(list(ga.clause_satisfaction(ind)), [GA.sat(ind, clause) for clause in ga.formula])
+
+    def test_evaluate_cache(self):
+        reader = self.FormulaReader("../Test Input/trivial1.cnf")
+        ga = GA(reader.formula, 5, 9, 5, 9, 5, 5)
+        ga._fit_cache_cap = 2
+        keys = {}
+        for data in ["111111111", "111111110", "000000000", "111111111"]:
+            ind = Individual(9)
+            ind.data = data
+            keys[data] = ind.bits.tobytes()
+            ga.evaluate(ind)
+        # The least recently used assignment was evicted
+        self.assertEqual(list(ga._fit_cache.keys()), [keys["000000000"], keys["111111111"]])
+        ind = Individual(9)
+        ind.data = "111111110"
+        ga._fit_cache[ind.bits.tobytes()] = 7
+        self.assertEqual(ga.evaluate(ind), 7)
+        # A later GA on the same formula carries on with the given cache
+        ind = Individual(9)
+        ind.data = "111111110"
+        self.assertEqual(GA(reader.formula, 5, 9, 5, 9, 5, 5, fit_cache=ga._fit_cache).evaluate(ind), 7)
+        # An inherited cache is trimmed to the size of the new GA at once, keeping the most recent entries
+        inherited = OrderedDict((bytes([i]), i) for i in range(50))
+        GA(reader.formula, 5, 9, 5, 9, 5, 5, population_size=2, sub_population_size=2, fit_cache=inherited)
+        self.assertEqual(list(inherited.values()), list(range(30, 50)))
+
+    def test_evaluate_uniform_width(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/f1000.cnf")
+        ga = GA(reader.formula, 4250, 1000, 10, 5, 5, 5)
+        self.assertEqual(ga.clause_width, 3)
+        for _ in range(3):
+            ind = Individual(1000)
+            expected = [GA.sat(ind, clause) for clause in ga.formula]
+            for use_kernels in {False, kernels.HAS_NUMBA}:
+                ga.use_kernels = use_kernels
+                ga._fit_cache.clear()
+                ind.isCacheValid = False
+                self.assertEqual(list(ga.clause_satisfaction(ind)), expected)
+                self.assertEqual(ga.evaluate(ind), expected.count(False))
+
+    @skipUnless(kernels.HAS_NUMBA, "Numba is not installed.")
+    def test_generated_kernels(self):
+        rng = random.Random(5)
+        # A 2-SAT formula whose assignments fit in a single word and a 4-SAT formula over two words
+        for width, variables in [(2, 9), (4, 100)]:
+            formula = [tuple(v * rng.choice([-1, 1]) for v in rng.sample(range(1, variables + 1), width))
+                       for _ in range(60)]
+            ga = GA(formula, 60, variables, 5, 5, 5, 5)
+            ga.generated_min_clauses = 0
+            self.assertIsNotNone(ga._uniform_kernels())
+            for _ in range(3):
+                ind = Individual(variables)
+                expected = [GA.sat(ind, clause) for clause in formula]
+                self.assertEqual(list(ga.clause_satisfaction(ind)), expected)
+                self.assertEqual(ga._count_unsatisfied(ind), expected.count(False))
+                self.assertEqual(list(ga._count_unsatisfied_rows(ind.bits[None])), [expected.count(False)])
+
+    def test_clause_satisfaction_empty_clause(self):
+        ga = GA([(1, -2), (), (2, 2, -3), (-1,)], 4, 3, 1, 5, 5, 5)
+        ind = Individual(3)
+        ind.data = "110"
+        for use_kernels in {False, kernels.HAS_NUMBA}:
+            ga.use_kernels = use_kernels
+            self.assertEqual(list(ga.clause_satisfaction(ind)), [True, False, True, False])
+            self.assertEqual(list(ga.clause_degrees(ind)), [1, 0, 2, 0])
+
+    @skipUnless(kernels.HAS_NUMBA, "Numba is not installed.")
+    def test_parallel_kernels(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        for _ in range(3):
+            ind = Individual(324)
+            expected = [GA.sat(ind, clause) for clause in ga.formula]
+            ga.parallel_min_clauses = 1
+            ga._fit_cache.clear()
+            ind.isCacheValid = False
+            self.assertEqual(list(ga.clause_satisfaction(ind)), expected)
+            self.assertEqual(ga.evaluate(ind), expected.count(False))
+
+    def test_evaluate_bound(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/f1000.cnf")
+        ga = GA(reader.formula, 4250, 1000, 10, 5, 5, 5)
+        ind = Individual(1000)
+        fitness = [GA.sat(ind, clause) for clause in ga.formula].count(False)
+        # A fitness above the bound is only reported as such and is not stored
+        self.assertGreater(ga.evaluate(ind, fitness - 1), fitness - 1)
+        self.assertFalse(ind.isCacheValid)
+        self.assertEqual(ga.evaluate(ind, fitness), fitness)
+        self.assertTrue(ind.isCacheValid)
+        self.assertEqual(ga.evaluate(ind), fitness)
+
     def test_improvement(self):
         reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga = GA(reader.formula, 9, 5, 4, 5, 5, 5)
         ind = Individual(9)
-        ind.data = bitarray("000100000")
+        ind.data = "000100000"
         self.assertEqual(ga.improvement(ind, 1), 1)
         self.assertEqual(ga.improvement(ind, 6), 1)
         ind.flip(6)
         self.assertEqual(ga.improvement(ind, 6), -1)
 
+    def test_improvement_incremental(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        ind = Individual(324)
+        for index in range(1, 325, 7):
+            ga.use_bitmask = False
+            expected = ga.improvement(ind, index)
+            ga.use_bitmask = True
+            self.assertEqual(expected, ga.improvement(ind, index))
+            # Move on from a different assignment each time, keeping the counts up to date
+            ind.flip_incremental(index, ga.var_pos_clauses[index], ga.var_neg_clauses[index])
+            ga.use_bitmask = False
+            ind.isCacheValid = False
+            self.assertEqual(ind.num_unsat, ga.evaluate(ind))
+
+    def test_flip(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        ind = Individual(324)
+        for index in range(1, 325, 11):
+            ga._flip(ind, index)
+            # The fitness is kept up to date by the flip itself
+            self.assertTrue(ind.isCacheValid)
+            self.assertEqual(ga.evaluate(ind), [GA.sat(ind, clause) for clause in ga.formula].count(False))
+
+    def test_flip_gains(self):
+        for filename, variables, clauses in [("../Test Input/Large Problems/par16-4-c.cnf", 324, 1292),
+                                             ("../Test Input/trivial2.cnf", 3, 3)]:
+            reader = self.FormulaReader(filename)
+            ga = GA(reader.formula, clauses, variables, 2, 5, 5, 5)
+            ind = Individual(variables)
+            gains = ga.flip_gains(ind)
+            ga.use_bitmask = False
+            self.assertEqual(list(gains[1:variables + 1]),
+                             [ga.improvement(ind, index) for index in range(1, variables + 1)])
+
+    @skipUnless(kernels.HAS_NUMBA, "Numba is not installed.")
+    def test_kernels(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        for _ in range(5):
+            ind = Individual(324)
+            ga.use_kernels = False
+            satisfaction, degrees = ga.clause_satisfaction(ind), ga.clause_degrees(ind)
+            gains = ga.flip_gains(ind)
+            ind.isCacheValid = False
+            fitness = ga.evaluate(ind)
+            ind.true_counts = None
+            ga.use_kernels = True
+            self.assertEqual(list(satisfaction), list(ga.clause_satisfaction(ind)))
+            self.assertEqual(list(degrees), list(ga.clause_degrees(ind)))
+            self.assertEqual(list(gains), list(ga.flip_gains(ind)))
+            self.assertEqual([ga.improvement(ind, index) for index in range(1, 325)], list(gains[1:325]))
+            ind.isCacheValid = False
+            ind.true_counts = None
+            ga._fit_cache.clear()
+            self.assertEqual(fitness, ga.evaluate(ind))
+
     def test_corrective_clause(self):
         # Read the trivial example and create a GA instance
         file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         # Create two individuals for which we know what the outcome should be
         first_parent = Individual(9)
-        first_parent.data = bitarray("000111000")
+        first_parent.data = "000111000"
         second_parent = Individual(9)
-        second_parent.data = bitarray("001110000")
+        second_parent.data = "001110000"
         # Perform crossover to get the child
         child = ga.corrective_clause(first_parent, second_parent)
         # Assert that crossover was correctly performed
@@ -98,9 +261,9 @@ class TestGA(TestCase):
         ga = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         # Create two individuals for which we know what the outcome should be
         first_parent = Individual(9)
-        first_parent.data = bitarray("000111000")
+        first_parent.data = "000111000"
         second_parent = Individual(9)
-        second_parent.data = bitarray("001110000")
+        second_parent.data = "001110000"
         # Perform crossover to get the child
         child = ga.corrective_clause_with_truth_maintenance(first_parent, second_parent)
         # Force the truth maintenance code to run by setting bits 3 and 6 to zero
@@ -120,9 +283,9 @@ class TestGA(TestCase):
         ga = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         # Create two individuals for which we know what the outcome should be
         first_parent = Individual(9)
-        first_parent.data = bitarray("001101011")
+        first_parent.data = "001101011"
         second_parent = Individual(9)
-        second_parent.data = bitarray("001110111")
+        second_parent.data = "001110111"
         # Perform crossover to get the child
         child = ga.fluerent_and_ferland(first_parent, second_parent)
         # Assert that crossover was correctly performed
@@ -134,27 +297,41 @@ class TestGA(TestCase):
         self.assertEqual(child.get(8), 1)
         self.assertEqual(child.get(9), 1)
 
+    def test_fluerent_and_ferland_clause_order(self):
+        file_reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(file_reader.formula, 1292, 324, 10, 5, 5, 5)
+        x, y = Individual(324), Individual(324)
+        child = ga.fluerent_and_ferland(x, y)
+        # Copying the clauses one by one onto the child must leave it unchanged
+        expected = child.clone()
+        for clause in ga.formula:
+            if GA.sat(x, clause) and not GA.sat(y, clause):
+                for atom in clause:
+                    expected.set(abs(atom), x.get(abs(atom)))
+            elif not GA.sat(x, clause) and GA.sat(y, clause):
+                for atom in clause:
+                    expected.set(abs(atom), y.get(abs(atom)))
+        self.assertEqual(str(child), str(expected))
+
     def test_standard_tabu_choose(self):
         # TEST 1 - All positions are tabu and best is the same as the individual........................................
         # An instance of the GA class which will be used to test the standard_tabu_choose function
         file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
-        ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
-        # The tabu list is set to the size which was received as parameter i.e. [5]
-        ga_implementation.tabu = ga_implementation.tabu[:ga_implementation.tabu_list_length]
-        # Every single position is tabu
+        ga_implementation = GA(file_reader.formula, 5, 9, 9, 5, 5, 5)
+        # Every single position is tabu, the tabu list being long enough to hold all of them
         for index in range(1, 10, 1):
-            ga_implementation.tabu.append(index)
+            ga_implementation.push_tabu(index)
 
         # Creating an individual that will represent the best individual during a tabu search procedure
         ind = Individual(9)
         # Individual is assigned values for variables to overwrite the random initialisation
-        ind.data = bitarray("000100000")
+        ind.data = "000100000"
         ga_implementation.best = ind
 
         # Creating an individual that will represent another individual for which we want to find best flip for
         ind = Individual(9)
         # Individual is assigned values for variables to overwrite the random initialisation
-        ind.data = bitarray("000100000")
+        ind.data = "000100000"
         # A test
         self.assertEqual(ga_implementation.standard_tabu_choose(ind)[1], [1, 2, 4, 6])
         # .............................................................................................................
@@ -162,18 +339,17 @@ class TestGA(TestCase):
         # TEST 2 - All positions are tabu and best individual is guaranteed to be better................................
 
         file_reader = self.FormulaReader("../Test Input/trivial2.cnf")
-        ga_implementation = GA(file_reader.formula, 1, 3, 2, 5, 5, 5)
-        ga_implementation.tabu = ga_implementation.tabu[:ga_implementation.tabu_list_length]
+        ga_implementation = GA(file_reader.formula, 1, 3, 3, 5, 5, 5)
 
         for index in range(1, 4, 1):
-            ga_implementation.tabu.append(index)
+            ga_implementation.push_tabu(index)
 
         ind = Individual(3)
-        ind.data = bitarray("111")
+        ind.data = "111"
         ga_implementation.best = ind
 
         ind = Individual(3)
-        ind.data = bitarray("000")
+        ind.data = "000"
         self.assertEqual(ga_implementation.standard_tabu_choose(ind)[1], [1, 2, 3])
         # .............................................................................................................
 
@@ -255,6 +431,17 @@ class TestGA(TestCase):
             tracker.print_diff()
             # .............................................................................................................
 
+
+    def test_standard_tabu_incremental_fitness(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/f1000.cnf")
+        ga = GA(reader.formula, 4250, 1000, 10, 5, 5, 5, max_flip=50)
+        counted = []
+        count_unsatisfied = ga._count_unsatisfied
+        ga._count_unsatisfied = lambda individual, bound=None: counted.append(bound) or count_unsatisfied(individual)
+        ind = ga.standard_tabu(Individual(1000), ga.standard_tabu_choose)
+        # Only the starting assignment is counted in full, every flip after it updates the fitness incrementally
+        self.assertEqual(counted, [None])
+        self.assertEqual(ga.evaluate(ind), [GA.sat(ind, clause) for clause in ga.formula].count(False))
     def test_choose_rvcf(self):
 
         # An instance of the GA class which will be used to test the standard_tabu_choose function
@@ -263,13 +450,13 @@ class TestGA(TestCase):
         # Creating an individual that will represent the best individual during a tabu search procedure
         ind = Individual(9)
         # Individual is assigned values for variables to overwrite the random initialisation
-        ind.data = bitarray("000000000")
+        ind.data = "000000000"
         # A test
         self.assertEqual(ga_implementation.choose_rvcf(ind)[1], [6])
 
         file_reader = self.FormulaReader("../Test Input/trivial2.cnf")
         ga_implementation = GA(file_reader.formula, 1, 3, 3, 5, 5, 5)
-        ind.data = bitarray("000")
+        ind.data = "000"
         self.assertEqual(ga_implementation.choose_rvcf(ind)[1], [1, 2, 3])
 
     def test_weight(self):
@@ -277,19 +464,92 @@ class TestGA(TestCase):
         file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         ind = Individual(9)
-        ind.data = bitarray("000000000")
+        ind.data = "000000000"
         self.assertEqual(ga_implementation.weight(ind, 4), 1.5)
-        ind.data = bitarray("111111111")
+        ind.data = "111111111"
         self.assertEqual(ga_implementation.weight(ind, 4), 1)
-        ind.data = bitarray("111010101")
+        ind.data = "111010101"
         self.assertEqual(ga_implementation.weight(ind, 4), 2)
 
+    def test_weight_incidence(self):
+        file_reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga_implementation = GA(file_reader.formula, 1292, 324, 10, 5, 5, 5)
+        ind = Individual(324)
+        for index in range(1, 325, 5):
+            value = ind.get(index)
+            c_ones = [clause for clause in ga_implementation.formula
+                      if (index in clause and value == 1) or (-index in clause and value == 0)]
+            c_zeros = [clause for clause in ga_implementation.formula
+                       if (index in clause and value == 0) or (-index in clause and value == 1)]
+            expected = 0
+            if c_ones:
+                expected += sum(GA.degree(ind, clause) for clause in c_ones) / len(c_ones)
+            if c_zeros:
+                expected += sum(GA.degree(ind, clause) for clause in c_zeros) / len(c_zeros)
+            self.assertAlmostEqual(ga_implementation.weight(ind, index), expected)
+
+    def test_weight_repeated_literal(self):
+        # Repeated literals count once per occurrence in the degree of a clause, as in GA.degree
+        formula = [(1, 1, -2), (2, -3, -3, -3), (1, -1, 3), (3, 2)]
+        ga = GA(formula, 4, 3, 1, 5, 5, 1)
+        for data in ["000", "100", "110", "011", "111"]:
+            ind = Individual(3)
+            ind.data = data
+            for index in [1, -1, 2, -2, 3, -3]:
+                value = ind.get(abs(index))
+                c_ones = [clause for clause in formula
+                          if (index in clause and value == 1) or (-index in clause and value == 0)]
+                c_zeros = [clause for clause in formula
+                           if (index in clause and value == 0) or (-index in clause and value == 1)]
+                expected = 0
+                if c_ones:
+                    expected += sum(GA.degree(ind, clause) for clause in c_ones) / len(c_ones)
+                if c_zeros:
+                    expected += sum(GA.degree(ind, clause) for clause in c_zeros) / len(c_zeros)
+                self.assertAlmostEqual(ga.weight(ind, index), expected)
+        ind = Individual(3)
+        ind.data = "100"
+        self.assertEqual(GA.degree(ind, (1, 1, -2)), 3)
+        self.assertEqual(ga.weight(ind, 1), 3)
+
+    def test_atoms_beyond_individual(self):
+        # The formula uses atoms 4 and 5 while the individuals only hold 3: their literals are false for both signs
+        formula = [(1, -4), (-5, -5, 2), (-4, -5), (3, 4, -1), (2, -3)]
+        for use_kernels in {False, kernels.HAS_NUMBA}:
+            ga = GA(formula, 5, 3, 1, 5, 5, 1)
+            ga.use_kernels = use_kernels
+            for data in ["000", "100", "011", "111"]:
+                ind = Individual(3)
+                ind.data = data
+                expected = [GA.sat(ind, clause) for clause in formula]
+                self.assertEqual(list(ga.clause_satisfaction(ind)), expected)
+                self.assertEqual(ga.evaluate(ind), expected.count(False))
+                other = Individual(3)
+                other.data = data
+                self.assertEqual(ga.evaluate_population([other]), [expected.count(False)])
+                for index in [1, -1, 2, -2, 3, -3]:
+                    value = ind.get(abs(index))
+                    c_ones = [clause for clause in formula
+                              if (index in clause and value == 1) or (-index in clause and value == 0)]
+                    c_zeros = [clause for clause in formula
+                               if (index in clause and value == 0) or (-index in clause and value == 1)]
+                    weight = 0
+                    if c_ones:
+                        weight += sum(GA.degree(ind, clause) for clause in c_ones) / len(c_ones)
+                    if c_zeros:
+                        weight += sum(GA.degree(ind, clause) for clause in c_zeros) / len(c_zeros)
+                    self.assertAlmostEqual(ga.weight(ind, index), weight)
+                gains = ga.flip_gains(ind)
+                ga.use_bitmask = False
+                self.assertEqual(list(gains[1:]), [ga.improvement(ind, index) for index in range(1, len(gains))])
+                ga.use_bitmask = True
+
     def test_degree(self):
         ind = Individual(9)
-        ind.data = bitarray("100100000")
+        ind.data = "100100000"
         self.assertEqual(GA.degree(ind, [9, -5]), 1)
         self.assertEqual(GA.degree(ind, [1, 3, 6]), 1)
-        ind.data = bitarray("000000110")
+        ind.data = "000000110"
         self.assertEqual(GA.degree(ind, [7, 8, -3]), 3)
 
     def test_tabu_with_diversification(self):
@@ -297,45 +557,188 @@ class TestGA(TestCase):
         ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         ga_implementation.tabu = [0, 0, 0, 0, 5]
         ind = Individual(9)
-        ind.data = bitarray("111111111")
+        ind.data = "111111111"
         ga_implementation.tabu_with_diversification(ind)
 
-        self.assertEqual(1, 1)
+        # The last clause (-6 -4) is false and reaches max_false, which resets its count
+        ga_implementation.false_counts = [4, 4, 4, 4, 4]
+        result = ga_implementation.tabu_with_diversification(ind)
+        self.assertEqual(ga_implementation.false_counts, [4, 4, 4, 4, 0])
+        self.assertEqual(str(ind), "111111111")
+        self.assertIsNot(result, ind)
 
     def test_check_flip(self):
         file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, 5)
         forbidden_flips = {}
         ind = Individual(9)
-        ind.data = bitarray("111111111")
+        ind.data = "111111111"
         ga_implementation.check_flip(ind, ga_implementation.formula[4], forbidden_flips)
-        self.assertEqual(ind.data, bitarray("111110111"))
+        self.assertEqual(str(ind), "111110111")
+
+    def test_age_forbidden_flips(self):
+        file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
+        ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, k=3)
+        forbidden_flips = {1: 0, 4: 2, 7: 1}
+        ga_implementation._age_forbidden_flips(forbidden_flips)
+        self.assertEqual(forbidden_flips, {1: 1, 7: 2})
+
+    def test_push_tabu(self):
+        file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
+        ga_implementation = GA(file_reader.formula, 5, 9, 3, 5, 5, 5)
+        for index in [1, 2, 3, 2, 4]:
+            ga_implementation.push_tabu(index)
+        # 2 is moved to the back when pushed again and 1 is evicted when the full list receives 4
+        self.assertEqual(ga_implementation.tabu, (3, 2, 4))
+        # The tabu list cannot be changed through a copy of it
+        with self.assertRaises(AttributeError):
+            ga_implementation.tabu.append(5)
+        self.assertEqual([ga_implementation.is_tabu(index) for index in range(1, 6)],
+                         [False, True, True, True, False])
+        ga_implementation.tabu = [5]
+        self.assertEqual(ga_implementation.tabu, (5,))
+        self.assertFalse(ga_implementation.is_tabu(4))
 
     def test_select(self):
-        self.assertEqual(1, 1)
+        file_reader = self.FormulaReader("../Test Input/trivial1.cnf")
+        ga_implementation = GA(file_reader.formula, 5, 9, 5, 5, 5, 5, population_size=4, sub_population_size=2)
+        # A converged population in which every individual holds the same assignment
+        ga_implementation.population = [Individual(9) for _ in range(4)]
+        for ind in ga_implementation.population:
+            ind.data = "111111111"
+        for _ in range(10):
+            child_x, child_y = ga_implementation.select()
+            self.assertIsNot(child_x, child_y)
+            self.assertEqual({id(child_x), id(child_y)}, {id(ind) for ind in ga_implementation.population[:2]})
 
     def test_create_population(self):
         self.assertEqual(1, 1)
 
+    def test_sort_population(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        ga.population = [Individual(324) for _ in range(20)]
+        fitness_values = ga.sort_population()
+        self.assertEqual(fitness_values, sorted(fitness_values))
+        self.assertEqual(fitness_values, [ga.evaluate(ind) for ind in ga.population])
+
+    def test_evaluate_population(self):
+        for filename, variables, clauses in [("../Test Input/Large Problems/par16-4-c.cnf", 324, 1292),
+                                             ("../Test Input/Large Problems/f1000.cnf", 1000, 4250)]:
+            reader = self.FormulaReader(filename)
+            ga = GA(reader.formula, clauses, variables, 10, 5, 5, 5)
+            for use_kernels in {False, kernels.HAS_NUMBA}:
+                ga.use_kernels = use_kernels
+                population = [Individual(variables) for _ in range(7)]
+                expected = [[GA.sat(ind, clause) for clause in ga.formula].count(False) for ind in population]
+                self.assertEqual(ga.evaluate_population(population), expected)
+                self.assertTrue(all(ind.isCacheValid for ind in population))
+            # Assignments seen before are answered from the fitness cache
+            ind = Individual(variables)
+            ga._fit_cache[ind.bits.tobytes()] = 12345
+            self.assertEqual(ga.evaluate_population([population[0], ind]), [expected[0], 12345])
+
+    def test_thread_pool(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        population = [Individual(324) for _ in range(6)]
+        expected = [[GA.sat(ind, clause) for clause in reader.formula].count(False) for ind in population]
+        # A single worker evaluates on the calling thread, without starting a pool
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5, workers=1)
+        self.assertEqual(ga.evaluate_population([ind.clone() for ind in population]), expected)
+        self.assertIsNone(ga._pool)
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5, workers=3)
+        self.assertEqual(ga.evaluate_population([ind.clone() for ind in population]), expected)
+        self.assertIsNotNone(ga._pool)
+        # The pool is shut down when the algorithm finishes
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5, max_generations=2, population_size=6, sub_population_size=2,
+                max_flip=5, workers=3)
+        ga.gasat()
+        self.assertIsNone(ga._pool)
+
     def test_is_satisfied(self):
         reader = self.FormulaReader("../Test Input/trivial1.cnf")
         ga = GA(reader.formula, 9, 5, 4, 5, 5, 5)
         ind = Individual(9)
-        ind.data = bitarray("000000000")
+        ind.data = "000000000"
         ind.isCacheValid = False
         ga.population = [ind for _ in range(100)]
 
         # There should not be a satisfiable assignment.
         self.assertIsNone(ga.is_satisfied())
 
-        ga.population[0].data = bitarray("111011111")
+        ga.population[0].data = "111011111"
         ga.population[0].isCacheValid = False
 
         # Population now has one satisfying assignment.
         self.assertIsNotNone(ga.is_satisfied())
 
     def test_replace(self):
-        self.assertEqual(1, 1)
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5)
+        ga.population = [Individual(324) for _ in range(20)]
+        ga.sort_population()
+        worst = ga.population[-1]
+        child = ga.population[0].clone()
+        child.fitness = child.fitness - 1
+        ga.replace(child)
+        self.assertIs(ga.population[0], child)
+        self.assertIs(ga.best_individual, child)
+        self.assertEqual(len(ga.population), 20)
+        self.assertNotIn(worst, ga.population)
+        fitness_values = [ind.fitness for ind in ga.population]
+        self.assertEqual(fitness_values, sorted(fitness_values))
 
     def test_gasat(self):
         self.assertEqual(1, 1)
+
+    def test_notify_every(self):
+        class Recorder:
+            def __init__(self):
+                self.generations = []
+
+            def update(self, arg):
+                self.generations.append(arg)
+
+        reader = self.FormulaReader("../Test Input/trivial1.cnf")
+        ga = GA(reader.formula, 5, 9, 5, 5, 5, 5, max_generations=10, notify_every=4, notify_interval=0)
+        recorder = Recorder()
+        ga.attach(recorder)
+        for generation in range(11):
+            ga.generation_counter = generation
+        self.assertEqual(recorder.generations, [0, 4, 8, 10])
+        # A GA notifies a single observer, attaching another replaces the first
+        replacement = Recorder()
+        ga.attach(replacement)
+        ga.generation_counter = 4
+        ga.detach(recorder)
+        ga.generation_counter = 8
+        ga.detach(replacement)
+        ga.generation_counter = 10
+        self.assertEqual(recorder.generations, [0, 4, 8, 10])
+        self.assertEqual(replacement.generations, [4, 8])
+        # Updates are spaced notify_interval seconds apart, apart from the last one
+        ga = GA(reader.formula, 5, 9, 5, 5, 5, 5, max_generations=10, notify_interval=60)
+        self.assertEqual(ga.notify_every, 1)
+        recorder = Recorder()
+        ga.attach(recorder)
+        for generation in range(11):
+            ga.generation_counter = generation
+        self.assertEqual(recorder.generations, [0, 10])
+        # A run that is satisfied before the last generation still reports the generation it ended on
+        ga = GA([(v,) for v in range(1, 13)], 12, 12, 1, 5, 5, 1, max_generations=100, population_size=4,
+                sub_population_size=2, max_flip=50, seed=1, notify_interval=60)
+        recorder = Recorder()
+        ga.attach(recorder)
+        self.assertEqual(ga.gasat().fitness, 0)
+        self.assertLess(ga.generation_counter, 100)
+        self.assertEqual(recorder.generations, [0, ga.generation_counter])
+
+    def test_seed(self):
+        reader = self.FormulaReader("../Test Input/Large Problems/par16-4-c.cnf")
+        runs = []
+        for _ in range(2):
+            ga = GA(reader.formula, 1292, 324, 10, 5, 5, 5, max_generations=3, population_size=10,
+                    sub_population_size=4, max_flip=20, seed=11)
+            ga.create_population()
+            runs.append([str(ind) for ind in ga.population] + [str(ind) for ind in ga.select()])
+        self.assertEqual(runs[0], runs[1])
@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import subprocess
+import io
+from contextlib import redirect_stdout
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../SATSolver')
+from unittest import TestCase
+from SATController import SATController
+from GA import InputError
+
+
+class TestSATController(TestCase):
+    """
+    Testing class for SATController.
+    """
+
+    class FakeServer:
+        """ Collects the messages pushed to the clients. """
+
+        def __init__(self):
+            self.messages = []
+
+        def push_to_all(self, message):
+            self.messages.append(json.loads(message[:-1])["RESPONSE"])
+
+    def setUp(self):
+        self.controller = SATController.instance()
+        self.controller.server_thread = self.FakeServer()
+        self.controller.log_every = 1000
+
+    def tearDown(self):
+        self.controller.server_thread = None
+        self.controller.GA = None
+        self.controller._ga_parameters = None
+        self.controller.log_every = 1
+
+    def read(self, filename):
+        with open(os.path.join(myPath, filename)) as f:
+            formula, number_of_variables, number_of_clauses = self.controller.parse_formula(f.readlines())
+        return dict(formula=formula, number_of_variables=number_of_variables, number_of_clauses=number_of_clauses,
+                    tabu_list_length=1, max_false=5, rec=3, k=3, max_generations=20, population_size=6,
+                    sub_population_size=2, max_flip=100)
+
+    def test_import_request_handler(self):
+        # The request handler imports the controller, which must not need the request handler to be loaded first
+        result = subprocess.run([sys.executable, "-c", "import RequestHandler"], cwd=myPath + '/../SATSolver',
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(result.returncode, 0, result.stderr.decode())
+
+    def test_start_ga(self):
+        self.controller.create_ga(self.read("../Test Input/trivial1.cnf"))
+        # A poll before the first generation is answered without an error
+        self.controller.update(self.controller._generation_count)
+        self.controller.start_ga()
+        finished = self.controller.server_thread.messages[-1]["FINISHED"]
+        self.assertTrue(finished["SUCCESSFUL"])
+        self.assertEqual(finished["FITNESS"], 0)
+        self.assertEqual(len(finished["INDIVIDUAL"]), 9)
+
+    def test_log_every(self):
+        self.controller.create_ga(self.read("../Test Input/trivial1.cnf"))
+        self.controller.log_every = 2
+        self.controller._updates_received = 0
+        output = io.StringIO()
+        with redirect_stdout(output):
+            # Every second update is printed, whatever generations the updates report
+            for generation in [1, 3, 5, 7]:
+                self.controller.update(generation)
+        lines = output.getvalue().splitlines()
+        self.assertEqual([line.split("\t")[0] for line in lines], ["Generations: 3/20", "Generations: 7/20"])
+
+    def test_seed(self):
+        runs = []
+        for _ in range(2):
+            parameters = self.read("../Test Input/Large Problems/par16-4-c.cnf")
+            parameters.update(tabu_list_length=5, max_generations=5, population_size=10, sub_population_size=4,
+                              max_flip=20, seed=7)
+            self.controller.create_ga(parameters)
+            self.controller.start_ga()
+            finished = self.controller.server_thread.messages[-1]["FINISHED"]
+            runs.append((finished["FITNESS"], finished["INDIVIDUAL"]))
+        self.assertEqual(runs[0], runs[1])
+
+    def test_start_ga_portfolio(self):
+        with self.assertRaises(InputError):
+            self.controller.start_ga_portfolio(2)
+        parameters = self.read("../Test Input/trivial1.cnf")
+        parameters.update(seed=100)
+        self.controller.create_ga(parameters)
+        seed, crossover_operator, fitness, individual, generations, time_elapsed = self.controller.start_ga_portfolio(2)
+        self.assertEqual(fitness, 0)
+        self.assertIn(seed, [100, 101])
+        self.assertEqual(crossover_operator, seed - 100)
+        self.assertEqual(len(individual), 9)
+
+    def test_fit_cache(self):
+        parameters = self.read("../Test Input/trivial1.cnf")
+        self.controller.create_ga(parameters)
+        fit_cache = self.controller.GA._fit_cache
+        # An equal formula keeps the cache, another formula starts a new one
+        self.controller.create_ga(dict(parameters, formula=[tuple(clause) for clause in parameters["formula"]]))
+        self.assertIs(self.controller.GA._fit_cache, fit_cache)
+        self.controller.create_ga(dict(parameters, formula=parameters["formula"][:-1]))
+        self.assertIsNot(self.controller.GA._fit_cache, fit_cache)
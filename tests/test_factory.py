@@ -18,3 +18,5 @@ class TestFactory(TestCase):
         self.assertEqual(50, len(population))
         for individual in population:
             self.assertEqual(individual.length, 10)
+            # The bits beyond the length of the individual are never set
+            self.assertEqual(int(individual.bits[-1]) >> 10, 0)
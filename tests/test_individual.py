@@ -5,7 +5,8 @@ sys.path.insert(0, myPath + '/../SATSolver')
 
 from unittest import TestCase
 from individual import Individual
-from bitarray import bitarray
+import numpy as np
+import pickle
 
 
 class TestIndividual(TestCase):
@@ -15,14 +16,14 @@ class TestIndividual(TestCase):
 
     def test_get(self):
         ind = Individual(9)
-        ind.data = bitarray("011010100")
+        ind.data = "011010100"
         self.assertEqual(ind.get(5), 1)
         self.assertEqual(ind.get(1), 0)
         self.assertEqual(ind.get(10), None)
 
     def test_set(self):
         ind = Individual(9)
-        ind.data = bitarray("011010100")
+        ind.data = "011010100"
         ind.set(2, 1)
         self.assertEqual(ind.get(2), 1)
         ind.set(7, 0)
@@ -32,7 +33,7 @@ class TestIndividual(TestCase):
 
     def test_flip(self):
         ind = Individual(9)
-        ind.data = bitarray("011010100")
+        ind.data = "011010100"
         ind.flip(1)
         self.assertEqual(ind.get(1), 1)
         ind.flip(8)
@@ -40,3 +41,54 @@ class TestIndividual(TestCase):
         ind.flip(4)
         self.assertEqual(ind.get(4), 1)
 
+    def test_value(self):
+        ind = Individual(value="0110100011")
+        self.assertEqual(ind.length, 10)
+        self.assertEqual(str(ind), "0110100011")
+        self.assertEqual(ind.data, bytes([0, 1, 1, 0, 1, 0, 0, 0, 1, 1]))
+        ind.data = [True, False, True]
+        self.assertEqual(str(ind), "101")
+        self.assertEqual(list(ind.bits), [0b101])
+
+    def test_str(self):
+        ind = Individual(value="0110")
+        self.assertIs(str(ind), str(ind))
+        ind.flip(1)
+        self.assertEqual(str(ind), "1110")
+        ind.set(4, 1)
+        self.assertEqual(str(ind), "1111")
+        ind.bits = np.array([0b0100], dtype=np.uint64)
+        self.assertEqual(str(ind), "0010")
+        self.assertEqual(str(ind.clone()), "0010")
+
+    def test_pickle(self):
+        ind = Individual(value="0110")
+        twin = pickle.loads(pickle.dumps(ind))
+        twin.flip(1)
+        self.assertEqual(str(twin), "1110")
+        self.assertEqual(str(ind), "0110")
+
+    def test_from_bits(self):
+        # Bits 1, 3 and 9 set, and every bit beyond the length which must be dropped
+        ind = Individual.from_bits(9, np.array([0b100000101 | ~np.uint64(0b111111111)], dtype=np.uint64))
+        self.assertEqual(str(ind), "101000001")
+        self.assertEqual(list(ind.bits), [0b100000101])
+        self.assertFalse(ind.isCacheValid)
+
+    def test_view(self):
+        words = np.array([[0b101], [0b011]], dtype=np.uint64)
+        x, y = Individual.view(3, words[0]), Individual.view(3, words[1])
+        self.assertEqual(str(x), "101")
+        x.flip(2)
+        # The flip is written through to the row of x only
+        self.assertEqual(list(words[:, 0]), [0b111, 0b011])
+        self.assertEqual(str(y), "110")
+
+    def test_parents(self):
+        x, y = Individual(100), Individual(100)
+        x.data = "01" * 50
+        y.data = "0011" * 25
+        child = Individual(100, parents=(x, y))
+        for i in range(1, 101):
+            self.assertIn(child.get(i), (x.get(i), y.get(i)))
+        self.assertEqual(int(child.bits[-1]) >> 36, 0)